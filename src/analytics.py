@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+In-memory columnar analytics for the standard report pack
+Loads the six tables once into compact pandas frames (int32 ids, categorical
+names) and computes the five reports from run_sql_queries.py for every college
+in one vectorized pass, instead of five SQL queries per college.
+
+Usage:
+    python analytics.py --college-id 1      # reports for one college
+    python analytics.py --all-colleges      # reports for every college
+    python analytics.py --benchmark         # compare with the SQL path
+"""
+
+import argparse
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from run_sql_queries import DATABASE_PATH, STANDARD_REPORTS, print_report, run_standard_reports
+
+# Only the columns the reports read; rows with a missing key cannot join anything
+TABLE_QUERIES = {
+    "colleges": ("SELECT id, name FROM colleges", {"id": "int32", "name": "category"}),
+    "students": (
+        "SELECT id, name, email, college_id FROM students WHERE college_id IS NOT NULL",
+        {"id": "int32", "name": "string", "email": "string", "college_id": "int32"},
+    ),
+    "events": (
+        "SELECT id, title, college_id FROM events WHERE college_id IS NOT NULL",
+        {"id": "int32", "title": "category", "college_id": "int32"},
+    ),
+    "registrations": (
+        "SELECT id, student_id, event_id FROM registrations "
+        "WHERE student_id IS NOT NULL AND event_id IS NOT NULL",
+        {"id": "int32", "student_id": "int32", "event_id": "int32"},
+    ),
+    "attendance": (
+        "SELECT id, student_id, event_id FROM attendance "
+        "WHERE student_id IS NOT NULL AND event_id IS NOT NULL",
+        {"id": "int32", "student_id": "int32", "event_id": "int32"},
+    ),
+    "feedback": (
+        "SELECT id, student_id, event_id, rating FROM feedback WHERE event_id IS NOT NULL",
+        {"id": "int32", "student_id": "Int32", "event_id": "int32", "rating": "float32"},
+    ),
+}
+
+def load_tables(path=DATABASE_PATH) -> dict:
+    """Read the six tables over one connection into typed frames"""
+    conn = sqlite3.connect(path)
+    try:
+        return {
+            name: pd.read_sql_query(query, conn).astype(dtypes)
+            for name, (query, dtypes) in TABLE_QUERIES.items()
+        }
+    finally:
+        conn.close()
+
+def memory_usage(tables: dict) -> int:
+    """Bytes held by the loaded frames"""
+    return int(sum(frame.memory_usage(deep=True).sum() for frame in tables.values()))
+
+def _round(values, digits: int = 2):
+    """
+    Round half away from zero like SQLite's ROUND (numpy rounds half to even).
+    The epsilon absorbs binary representation error, e.g. 2.675 -> 2.68 as in SQLite.
+    """
+    scale = 10 ** digits
+    return np.floor(np.asarray(values, dtype="float64") * scale + 0.5 + 1e-9) / scale
+
+def _per_event(frame: pd.DataFrame, events: pd.DataFrame) -> np.ndarray:
+    """Rows of ``frame`` per event, aligned with ``events``"""
+    return frame["event_id"].value_counts().reindex(events["id"], fill_value=0).to_numpy()
+
+def compute_reports(tables: dict, college_ids=None) -> dict:
+    """
+    Compute the standard report pack for ``college_ids`` (default: all colleges).
+    Each result is one frame with a ``college_id`` column, ordered like the SQL
+    reports within each college.
+    """
+    colleges = tables["colleges"]
+    events = tables["events"]
+    students = tables["students"]
+    if college_ids is not None:
+        college_ids = np.asarray(list(college_ids), dtype="int32")
+        colleges = colleges[colleges["id"].isin(college_ids)]
+        events = events[events["college_id"].isin(college_ids)]
+        students = students[students["college_id"].isin(college_ids)]
+    events = events.reset_index(drop=True)
+
+    registrations = tables["registrations"]
+    attendance = tables["attendance"]
+    feedback = tables["feedback"]
+    base = events[["college_id", "id", "title"]]
+
+    # 1. Total registrations per event
+    registered = _per_event(registrations, events)
+    registrations_per_event = base.assign(registrations=registered).sort_values(
+        ["college_id", "registrations"], ascending=[True, False], kind="stable"
+    )
+
+    # 2. Attendance percentage per event: check-ins of registered students only
+    matched = attendance.merge(registrations[["student_id", "event_id"]], on=["student_id", "event_id"])
+    present = _per_event(matched, events)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentage = np.where(registered > 0, _round(100.0 * present / registered), 0.0)
+    attendance_percentage = base.assign(
+        present=present, registered=registered, attendance_pct=percentage
+    ).sort_values(["college_id", "attendance_pct"], ascending=[True, False], kind="stable")
+
+    # 3. Average feedback score
+    ratings = feedback["rating"].astype("float64").groupby(feedback["event_id"]).agg(["mean", "size"]).reindex(events["id"])
+    average_feedback = base.assign(
+        avg_rating=_round(ratings["mean"]),
+        feedback_count=ratings["size"].fillna(0).astype("int64").to_numpy(),
+    ).sort_values(["college_id", "avg_rating"], ascending=[True, False], kind="stable", na_position="last")
+
+    # 4. Top 3 most active students per college
+    attended = attendance["student_id"].value_counts()
+    active = students[students["id"].isin(attended.index)]
+    top_students = (
+        active.assign(attended_events=attended.reindex(active["id"]).to_numpy())
+        .sort_values(["college_id", "attended_events", "id"], ascending=[True, False, True], kind="stable")
+        .groupby("college_id", sort=False)
+        .head(3)[["college_id", "id", "name", "email", "attended_events"]]
+    )
+
+    # 5. College summary statistics
+    event_college = pd.Series(events["college_id"].to_numpy(), index=events["id"])
+    def per_college(frame):
+        return (
+            frame["event_id"].map(event_college).dropna().astype("int32").value_counts()
+            .reindex(colleges["id"], fill_value=0).to_numpy()
+        )
+    college_summary = pd.DataFrame({
+        "college_id": colleges["id"].to_numpy(),
+        "total_events": events["college_id"].value_counts().reindex(colleges["id"], fill_value=0).to_numpy(),
+        "total_registrations": per_college(registrations),
+        "total_attendance": per_college(attendance),
+        "total_feedback": per_college(feedback),
+    }).sort_values("college_id")
+
+    return {
+        "registrations_per_event": registrations_per_event.reset_index(drop=True),
+        "attendance_percentage": attendance_percentage.reset_index(drop=True),
+        "average_feedback": average_feedback.reset_index(drop=True),
+        "top_students": top_students.reset_index(drop=True),
+        "college_summary": college_summary.reset_index(drop=True),
+    }
+
+def run_sql_path(path, college_ids) -> dict:
+    """The SQL report pack for every college, concatenated like ``compute_reports``"""
+    conn = sqlite3.connect(path)
+    try:
+        results = {key: [] for key, _, _ in STANDARD_REPORTS}
+        for college_id in college_ids:
+            for key, frame in run_standard_reports(conn, int(college_id)).items():
+                results[key].append(frame.assign(college_id=int(college_id)))
+        return {key: pd.concat(frames, ignore_index=True) for key, frames in results.items() if frames}
+    finally:
+        conn.close()
+
+def compare_results(sql_results: dict, frame_results: dict) -> list:
+    """Return the report keys whose numbers differ between the two paths"""
+    mismatched = []
+    for key, sql_frame in sql_results.items():
+        frame = frame_results[key]
+        if key == "top_students":
+            # Ties at third place may pick different students; compare the counts only
+            columns = ["college_id", "attended_events"]
+        else:
+            columns = [column for column in sql_frame.columns if column not in ("title", "name", "email")]
+        # Ties may be ordered differently, so compare as sorted sets of rows
+        left = sql_frame[columns].astype("float64").round(2).sort_values(columns).to_numpy()
+        right = frame[columns].astype("float64").round(2).sort_values(columns).to_numpy()
+        if left.shape != right.shape or not np.allclose(left, right, equal_nan=True):
+            mismatched.append(key)
+    return mismatched
+
+def benchmark(path, repeat: int) -> dict:
+    """Time the SQL path against load + compute for every college"""
+    college_ids = load_tables(path)["colleges"]["id"].tolist()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        sql_results = run_sql_path(path, college_ids)
+    sql_seconds = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        tables = load_tables(path)
+    load_seconds = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        frame_results = compute_reports(tables)
+    compute_seconds = (time.perf_counter() - started) / repeat
+
+    return {
+        "colleges": len(college_ids),
+        "rows": int(sum(len(frame) for frame in tables.values())),
+        "memory_bytes": memory_usage(tables),
+        "sql_seconds": round(sql_seconds, 4),
+        "load_seconds": round(load_seconds, 4),
+        "compute_seconds": round(compute_seconds, 4),
+        "columnar_seconds": round(load_seconds + compute_seconds, 4),
+        "mismatched_reports": compare_results(sql_results, frame_results),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute the standard report pack in memory")
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument("--college-id", type=int, help="only report on this college")
+    scope.add_argument("--all-colleges", action="store_true", help="report on every college")
+    parser.add_argument("--benchmark", action="store_true", help="time the SQL path against the columnar path")
+    parser.add_argument("--repeat", type=int, default=3, help="benchmark repetitions")
+    parser.add_argument("--db", default=DATABASE_PATH, help="SQLite database file")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"⏱️  Benchmarking the report pack on {args.db} ({args.repeat} runs)...")
+        result = benchmark(args.db, args.repeat)
+        print(f"   Colleges: {result['colleges']}, rows loaded: {result['rows']}, "
+              f"memory: {result['memory_bytes'] / 1024 / 1024:.1f} MB")
+        print(f"   SQL path (5 queries per college): {result['sql_seconds']}s")
+        print(f"   Columnar path: {result['columnar_seconds']}s "
+              f"(load {result['load_seconds']}s + compute {result['compute_seconds']}s)")
+        faster = "columnar" if result["columnar_seconds"] < result["sql_seconds"] else "SQL"
+        print(f"✅ The {faster} path is faster at this data size")
+        if result["mismatched_reports"]:
+            print(f"❌ Results differ for: {', '.join(result['mismatched_reports'])}")
+        return
+
+    tables = load_tables(args.db)
+    if tables["colleges"].empty:
+        print("❌ No colleges found. Please run sample_data.py first.")
+        return
+
+    college_ids = None if args.all_colleges or args.college_id is None else [args.college_id]
+    reports = compute_reports(tables, college_ids)
+    for key, description, _ in STANDARD_REPORTS:
+        print_report(reports[key], description)
+
+if __name__ == "__main__":
+    main()
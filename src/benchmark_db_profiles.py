@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark the SQLite engine profiles under a mixed read/write load
+Runs the same workload (event reports mixed with check-ins) against a fresh
+database for each profile in db_profile.py and compares the throughput.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from db_profile import PROFILES, create_db_engine, scratch_directory, use_scratch_database
+
+# Keep the benchmark away from the real database when main.py is imported
+use_scratch_database()
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from main import (
+    Base, College, Student, Event, Registration, Attendance,
+    build_event_reports, bump_event_stats, rebuild_event_stats
+)
+
+def seed_database(SessionLocal, num_students: int, num_events: int):
+    """Create one college with registered students for the workload"""
+    db = SessionLocal()
+    try:
+        college = College(name="Benchmark College", location="Bench City")
+        db.add(college)
+        db.flush()
+
+        students = [
+            Student(name=f"Student {i}", email=f"student{i}@bench.edu", college_id=college.id)
+            for i in range(num_students)
+        ]
+        db.add_all(students)
+
+        start_time = datetime.utcnow()
+        events = [
+            Event(
+                title=f"Event {i}",
+                description="Benchmark event",
+                college_id=college.id,
+                start_time=start_time,
+                end_time=start_time + timedelta(hours=2),
+                location="Hall",
+                max_capacity=num_students
+            )
+            for i in range(num_events)
+        ]
+        db.add_all(events)
+        db.flush()
+
+        db.add_all(
+            Registration(student_id=student.id, event_id=event.id)
+            for event in events for student in students
+        )
+        db.commit()
+        rebuild_event_stats(db)
+        return college.id, [student.id for student in students], [event.id for event in events]
+    finally:
+        db.close()
+
+def run_profile(profile: str, threads: int, seconds: float, write_ratio: float,
+                num_students: int, num_events: int) -> dict:
+    """Run the mixed workload against a fresh database using ``profile``"""
+    directory = scratch_directory()
+    engine = create_db_engine(f"sqlite:///{directory}/benchmark.db", profile=profile)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    college_id, student_ids, event_ids = seed_database(SessionLocal, num_students, num_events)
+
+    # Attendance is unique per student and event, so each check-in takes a distinct registration
+    pending_check_ins = [(student_id, event_id) for event_id in event_ids for student_id in student_ids]
+    random.Random(0).shuffle(pending_check_ins)
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        local = {"reads": 0, "writes": 0, "errors": 0}
+        db = SessionLocal()
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    check_in = None
+                    if rng.random() < write_ratio:
+                        # Once every registration is checked in, the run continues with reads only
+                        with lock:
+                            check_in = pending_check_ins.pop() if pending_check_ins else None
+                    if check_in:
+                        student_id, event_id = check_in
+                        db.add(Attendance(student_id=student_id, event_id=event_id))
+                        bump_event_stats(db, event_id, attendance_count=1)
+                        db.commit()
+                        local["writes"] += 1
+                    else:
+                        build_event_reports(db, Event.college_id == college_id)
+                        db.rollback()
+                        local["reads"] += 1
+                except OperationalError:
+                    db.rollback()
+                    local["errors"] += 1
+        finally:
+            db.close()
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    total = counts["reads"] + counts["writes"]
+    return {
+        "profile": profile,
+        "threads": threads,
+        "seconds": round(elapsed, 2),
+        "reads": counts["reads"],
+        "writes": counts["writes"],
+        "errors": counts["errors"],
+        "ops_per_second": round(total / elapsed, 1),
+        "writes_per_second": round(counts["writes"] / elapsed, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SQLite engine profiles")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--threads", type=int, default=8, help="concurrent workers")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration per profile")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="share of operations that are check-ins")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for profile in args.profiles:
+        if not args.json:
+            print(f"⏱️  Running '{profile}' profile for {args.seconds}s with {args.threads} threads...")
+        results.append(run_profile(
+            profile, args.threads, args.seconds, args.write_ratio, args.students, args.events
+        ))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\n{'profile':<10} {'ops/s':>10} {'writes/s':>10} {'reads':>8} {'writes':>8} {'errors':>8}")
+    print("-" * 60)
+    for result in results:
+        print(
+            f"{result['profile']:<10} {result['ops_per_second']:>10} {result['writes_per_second']:>10} "
+            f"{result['reads']:>8} {result['writes']:>8} {result['errors']:>8}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark the report and check-in paths before and after the index migrations
+Seeds a throwaway database, migrates it down to schema version 1 (no composite
+indexes), times the hot queries, migrates it back up and times them again.
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from db_profile import create_db_engine, scratch_directory, use_scratch_database
+
+# Keep the benchmark away from the real database when main.py is imported
+use_scratch_database()
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from main import (
+    Base, College, Student, Event, Registration, Attendance, Feedback,
+    aggregate_event_stats, bump_event_stats, rebuild_event_stats
+)
+from migrations import LATEST_VERSION, get_schema_version, migrate
+
+def seed_database(engine, num_colleges: int, num_students: int, num_events: int,
+                  registrations_per_student: int, rng: random.Random):
+    """Bulk-load colleges, students, events and their activity"""
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(insert(College), [
+            {"id": i, "name": f"College {i}", "location": "Bench City"} for i in range(1, num_colleges + 1)
+        ])
+        connection.execute(insert(Student), [
+            {"id": i, "name": f"Student {i}", "email": f"student{i}@bench.edu",
+             "college_id": rng.randint(1, num_colleges)}
+            for i in range(1, num_students + 1)
+        ])
+        connection.execute(insert(Event), [
+            {"id": i, "title": f"Event {i}", "description": "Benchmark event",
+             "college_id": rng.randint(1, num_colleges),
+             "start_time": now + timedelta(hours=rng.randint(-2000, 2000)),
+             "end_time": now + timedelta(hours=2), "location": "Hall",
+             "max_capacity": num_students, "is_cancelled": False}
+            for i in range(1, num_events + 1)
+        ])
+
+        registrations, attendance, feedback = [], [], []
+        for student_id in range(1, num_students + 1):
+            for event_id in rng.sample(range(1, num_events + 1), registrations_per_student):
+                registrations.append({"student_id": student_id, "event_id": event_id})
+                if rng.random() < 0.7:
+                    attendance.append({"student_id": student_id, "event_id": event_id})
+                    if rng.random() < 0.5:
+                        feedback.append({"student_id": student_id, "event_id": event_id,
+                                         "rating": rng.randint(1, 5)})
+        connection.execute(insert(Registration), registrations)
+        connection.execute(insert(Attendance), attendance)
+        connection.execute(insert(Feedback), feedback)
+
+    attended = {(row["student_id"], row["event_id"]) for row in attendance}
+    pending = [
+        (row["student_id"], row["event_id"]) for row in registrations
+        if (row["student_id"], row["event_id"]) not in attended
+    ]
+    rng.shuffle(pending)
+    return pending
+
+def time_operation(operation, arguments) -> float:
+    """Run ``operation`` once per argument and return the mean time in milliseconds"""
+    started = time.perf_counter()
+    for argument in arguments:
+        operation(argument)
+    return (time.perf_counter() - started) * 1000 / len(arguments)
+
+def run_workload(SessionLocal, colleges, events, check_ins) -> dict:
+    """Time the report and check-in paths against the current schema"""
+    db = SessionLocal()
+    try:
+        def college_report(college_id):
+            aggregate_event_stats(db, Event.college_id == college_id).all()
+
+        def event_report(event_id):
+            aggregate_event_stats(db, Event.id == event_id).all()
+
+        def college_schedule(college_id):
+            db.query(Event).filter(Event.college_id == college_id).order_by(Event.start_time).limit(100).all()
+
+        def check_in(pair):
+            student_id, event_id = pair
+            db.query(Registration).filter(
+                Registration.student_id == student_id, Registration.event_id == event_id
+            ).first()
+            db.query(Attendance).filter(
+                Attendance.student_id == student_id, Attendance.event_id == event_id
+            ).first()
+            db.add(Attendance(student_id=student_id, event_id=event_id))
+            bump_event_stats(db, event_id, attendance_count=1)
+            db.commit()
+
+        return {
+            "college_report_ms": round(time_operation(college_report, colleges), 3),
+            "event_report_ms": round(time_operation(event_report, events), 3),
+            "college_schedule_ms": round(time_operation(college_schedule, colleges), 3),
+            "check_in_ms": round(time_operation(check_in, check_ins), 3),
+        }
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark queries before and after the index migrations")
+    parser.add_argument("--colleges", type=int, default=5)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--registrations", type=int, default=10, help="registrations per student")
+    parser.add_argument("--iterations", type=int, default=50, help="timed runs per operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engine = create_db_engine(f"sqlite:///{scratch_directory()}/benchmark.db")
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    if not args.json:
+        print(f"🔄 Seeding {args.students} students, {args.events} events...")
+    pending = seed_database(engine, args.colleges, args.students, args.events, args.registrations, rng)
+    with SessionLocal() as db:
+        rebuild_event_stats(db)
+
+    # Both phases run the same lookups
+    colleges = [rng.randint(1, args.colleges) for _ in range(args.iterations)]
+    events = [rng.randint(1, args.events) for _ in range(args.iterations)]
+    results = []
+    # Each phase checks in a different half of the pending registrations
+    halves = (pending[:args.iterations], pending[args.iterations:2 * args.iterations])
+    for phase, target, check_ins in (("before", 1, halves[0]), ("after", LATEST_VERSION, halves[1])):
+        migrate(engine, target)
+        if not args.json:
+            print(f"⏱️  Timing schema version {get_schema_version(engine)} ({phase})...")
+        timings = run_workload(SessionLocal, colleges, events, check_ins)
+        results.append({"phase": phase, "schema_version": target, **timings})
+    engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    operations = [key for key in results[0] if key.endswith("_ms")]
+    print(f"\n{'operation':<22} {'before':>10} {'after':>10} {'speedup':>9}")
+    print("-" * 54)
+    for operation in operations:
+        before, after = results[0][operation], results[1][operation]
+        speedup = f"{before / after:.1f}x" if after else "-"
+        print(f"{operation[:-3]:<22} {before:>9}ms {after:>9}ms {speedup:>9}")
+
+if __name__ == "__main__":
+    main()
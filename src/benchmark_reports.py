@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Benchmark the report endpoints and the SQL report pack across data scales
+Restores a generated snapshot per scale (see generate_data.py and snapshots.py),
+times the event, student and college report endpoints in-process and the five
+queries from run_sql_queries.py, and counts the SQL statements each one runs,
+so both scaling curves and N+1 regressions show up.
+
+Results can be saved as a versioned baseline and later runs compared with it;
+--compare exits with status 1 when an operation got slower than the threshold
+or runs more queries than before.
+
+Usage:
+    python benchmark_reports.py                          # small and medium scales
+    python benchmark_reports.py --scales small,medium,large --save
+    python benchmark_reports.py --compare --threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BASELINE_FORMAT_VERSION = 1
+DEFAULT_BASELINE = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "reports", "report_benchmarks.json"))
+
+from db_profile import scratch_directory
+
+# Every scale is restored into the same scratch file, which main.py binds to on import;
+# its directory is removed when the benchmark exits
+SCRATCH_DATABASE = os.path.join(scratch_directory(), "benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{SCRATCH_DATABASE}"
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from main import app, engine, metrics, readonly_engine
+from generate_data import SCALES
+from migrations import LATEST_VERSION
+from run_sql_queries import STANDARD_REPORTS
+from snapshots import ensure_snapshot, restore_snapshot
+
+BASE_TABLES = ("colleges", "students", "events", "registrations", "attendance", "feedback")
+
+class QueryCounter:
+    """Count SQL statements recorded by the app's metrics or sent through sqlite3 connections"""
+
+    def __init__(self, registry=None):
+        # The app's registry sees both engines and the statements it runs on raw
+        # DBAPI connections (such as the table version reads), which engine events miss
+        self.registry = registry
+        self.traced = 0
+
+    @property
+    def count(self) -> int:
+        return self.registry.statement_count() if self.registry is not None else self.traced
+
+    def increment(self, *args):
+        self.traced += 1
+
+    def attach_connection(self, connection: sqlite3.Connection):
+        connection.set_trace_callback(self.increment)
+        return self
+
+def git_revision() -> str:
+    """Current commit, if the benchmark runs inside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def measure(operation, arguments, counter) -> dict:
+    """Run ``operation`` once per argument; return latency statistics and queries per call"""
+    timings = []
+    queries = 0
+    for argument in arguments:
+        before = counter.count
+        started = time.perf_counter()
+        operation(argument)
+        timings.append((time.perf_counter() - started) * 1000)
+        queries += counter.count - before
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(0, round(0.95 * len(timings)) - 1)], 3),
+        "queries": round(queries / len(arguments), 2),
+    }
+
+def benchmark_scale(scale: str, iterations: int, rng: random.Random, counter: QueryCounter) -> dict:
+    """Restore ``scale`` into the scratch database and time every operation on it"""
+    # The file is replaced underneath the pools, so drop their connections first
+    engine.dispose()
+    readonly_engine.dispose()
+    restore_snapshot(scale, SCRATCH_DATABASE)
+
+    conn = sqlite3.connect(SCRATCH_DATABASE)
+    try:
+        rows = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in BASE_TABLES}
+        max_ids = {table: conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0] for table in ("colleges", "students", "events")}
+        events = [rng.randint(1, max_ids["events"]) for _ in range(iterations)]
+        students = [rng.randint(1, max_ids["students"]) for _ in range(iterations)]
+        colleges = [rng.randint(1, max_ids["colleges"]) for _ in range(iterations)]
+
+        operations = {}
+        with TestClient(app) as client:
+            def get(url):
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise RuntimeError(f"GET {url} returned {response.status_code}: {response.text[:200]}")
+
+            # One untimed call per endpoint so startup work and first-use caches are not measured
+            get(f"/reports/events/{events[0]}")
+            get(f"/reports/students/{students[0]}")
+            get(f"/reports/colleges/{colleges[0]}/events")
+
+            operations["event_report"] = measure(lambda i: get(f"/reports/events/{i}"), events, counter)
+            operations["student_report"] = measure(lambda i: get(f"/reports/students/{i}"), students, counter)
+            operations["college_events_report"] = measure(
+                lambda i: get(f"/reports/colleges/{i}/events"), colleges, counter
+            )
+
+        sql_counter = QueryCounter().attach_connection(conn)
+        for key, _, query in STANDARD_REPORTS:
+            operations[f"sql_{key}"] = measure(
+                lambda i: pd.read_sql_query(query, conn, params={"college_id": i}), colleges, sql_counter
+            )
+    finally:
+        conn.close()
+    return {"rows": sum(rows.values()), "table_rows": rows, "operations": operations}
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list:
+    """Return the operations that got slower than ``threshold`` or run more queries"""
+    regressions = []
+    for scale, result in results["scales"].items():
+        previous = baseline["scales"].get(scale)
+        if not previous:
+            continue
+        for name, current in result["operations"].items():
+            before = previous["operations"].get(name)
+            if not before:
+                continue
+            slower = current["median_ms"] - before["median_ms"]
+            if slower > min_delta_ms and current["median_ms"] > before["median_ms"] * (1 + threshold):
+                regressions.append({
+                    "scale": scale, "operation": name, "metric": "median_ms",
+                    "baseline": before["median_ms"], "current": current["median_ms"],
+                })
+            if current["queries"] > before["queries"]:
+                regressions.append({
+                    "scale": scale, "operation": name, "metric": "queries",
+                    "baseline": before["queries"], "current": current["queries"],
+                })
+    return regressions
+
+def print_results(results: dict, baseline: dict = None):
+    for scale, result in results["scales"].items():
+        previous = (baseline or {}).get("scales", {}).get(scale, {}).get("operations", {})
+        print(f"\n📊 {scale}: {result['rows']:,} rows")
+        print(f"{'operation':<34} {'median':>10} {'p95':>10} {'queries':>8} {'vs baseline':>12}")
+        print("-" * 78)
+        for name, timing in result["operations"].items():
+            change = ""
+            if name in previous and previous[name]["median_ms"]:
+                change = f"{timing['median_ms'] / previous[name]['median_ms']:.2f}x"
+            print(f"{name:<34} {timing['median_ms']:>8}ms {timing['p95_ms']:>8}ms {timing['queries']:>8} {change:>12}")
+
+    if len(results["scales"]) > 1:
+        # Scaling curve: median per operation as the data grows
+        scales = list(results["scales"])
+        print(f"\n📈 Median ms by scale: {' → '.join(scales)}")
+        for name in results["scales"][scales[0]]["operations"]:
+            curve = " → ".join(str(results["scales"][scale]["operations"][name]["median_ms"]) for scale in scales)
+            print(f"   {name:<34} {curve}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark report endpoints and SQL reports across data scales")
+    parser.add_argument("--scales", default="small,medium", help=f"comma-separated ({', '.join(SCALES)})")
+    parser.add_argument("--iterations", type=int, default=30, help="timed calls per operation and scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="compare with the baseline and flag regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        print(f"❌ Unknown scale: {', '.join(unknown)} (choose from {', '.join(SCALES)})")
+        return 1
+
+    baseline = None
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"❌ No baseline at {args.baseline}; run with --save first")
+            return 1
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("format_version") != BASELINE_FORMAT_VERSION:
+            print(f"❌ Baseline format {baseline.get('format_version')} is not {BASELINE_FORMAT_VERSION}; save a new one")
+            return 1
+        if baseline.get("schema_version") != LATEST_VERSION:
+            # Indexes, triggers and summary tables differ across versions, so timings would not compare
+            print(f"❌ Baseline was recorded at schema version {baseline.get('schema_version')}, "
+                  f"this code is at {LATEST_VERSION}; record a new one with --save")
+            return 1
+
+    counter = QueryCounter(metrics)
+    rng = random.Random(args.seed)
+    results = {
+        "format_version": BASELINE_FORMAT_VERSION,
+        "schema_version": LATEST_VERSION,
+        "git_revision": git_revision(),
+        "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "iterations": args.iterations,
+        "scales": {},
+    }
+    for scale in scales:
+        if not args.json:
+            print(f"🔄 Preparing the {scale} snapshot (generated on first use)...")
+        ensure_snapshot(scale)
+        if not args.json:
+            print(f"⏱️  Timing {scale}...")
+        results["scales"][scale] = benchmark_scale(scale, args.iterations, rng, counter)
+
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms) if baseline else []
+    if args.json:
+        print(json.dumps({**results, "regressions": regressions} if baseline else results, indent=2))
+    else:
+        print_results(results, baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        if not args.json:
+            print(f"\n✅ Baseline written to {args.baseline}")
+
+    if baseline:
+        if not args.json:
+            if regressions:
+                print(f"\n❌ {len(regressions)} regression(s) against {baseline.get('git_revision') or 'the baseline'}:")
+                for regression in regressions:
+                    print(f"   {regression['scale']}/{regression['operation']}: {regression['metric']} "
+                          f"{regression['baseline']} → {regression['current']}")
+            else:
+                print(f"\n✅ No regressions above {args.threshold:.0%} against the baseline")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
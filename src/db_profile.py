@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+SQLite engine profiles for Campus Event Reporting System
+Builds SQLAlchemy engines whose pooled connections all get the same PRAGMA
+settings, so journal mode, caching and lock waiting can be tuned per deployment.
+
+Environment variables:
+    DATABASE_URL          database URL (default: sqlite:///./campus_events.db)
+    DB_PROFILE            "tuned" (default) or "default" (stock SQLite settings)
+    SQLITE_JOURNAL_MODE   override journal_mode (e.g. WAL, DELETE)
+    SQLITE_SYNCHRONOUS    override synchronous (OFF, NORMAL, FULL)
+    SQLITE_CACHE_SIZE     override cache_size (negative values are KiB)
+    SQLITE_MMAP_SIZE      override mmap_size in bytes
+    SQLITE_TEMP_STORE     override temp_store (DEFAULT, FILE, MEMORY)
+    SQLITE_BUSY_TIMEOUT   override busy_timeout in milliseconds
+    DB_POOL_SIZE          connections kept open in the pool (default 10)
+    DB_MAX_OVERFLOW       extra connections allowed under load (default 20)
+    DB_POOL_TIMEOUT       seconds to wait for a free connection (default 30)
+    READONLY_POOL_SIZE    connections kept open in the read-only pool (default 5)
+    READONLY_MAX_OVERFLOW extra read-only connections allowed under load (default 5)
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from urllib.parse import quote
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+DEFAULT_DATABASE_URL = "sqlite:///./campus_events.db"
+
+# PRAGMA values applied to every new connection, in this order
+PROFILES = {
+    # Stock SQLite behaviour: rollback journal, small cache, no lock waiting
+    "default": {
+        "journal_mode": "DELETE",
+        "busy_timeout": 0,
+    },
+    # WAL lets readers and a writer work concurrently; NORMAL sync is safe in WAL mode
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+PRAGMA_ENV_OVERRIDES = {
+    "journal_mode": "SQLITE_JOURNAL_MODE",
+    "synchronous": "SQLITE_SYNCHRONOUS",
+    "cache_size": "SQLITE_CACHE_SIZE",
+    "mmap_size": "SQLITE_MMAP_SIZE",
+    "temp_store": "SQLITE_TEMP_STORE",
+    "busy_timeout": "SQLITE_BUSY_TIMEOUT",
+}
+
+# Pragmas that change the database file cannot be set on a read-only connection
+READONLY_SKIPPED_PRAGMAS = ("journal_mode",)
+
+def get_database_url() -> str:
+    """Return the configured database URL"""
+    return os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+
+def scratch_directory() -> str:
+    """Create a temporary directory that is removed when the process exits"""
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    return directory
+
+def use_scratch_database(filename: str = "import.db") -> str:
+    """
+    Point DATABASE_URL at a throwaway file unless it is already set.
+    main.py creates and migrates its database on import, so scripts that only
+    need its models call this first to keep the real database untouched.
+    """
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch_directory(), filename)}"
+    return os.environ["DATABASE_URL"]
+
+def get_pragmas(profile: str = None) -> dict:
+    """Return the PRAGMA settings for a profile with environment overrides applied"""
+    profile = profile or os.getenv("DB_PROFILE", "tuned")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown database profile: {profile} (choose from {', '.join(PROFILES)})")
+
+    pragmas = dict(PROFILES[profile])
+    for name, env_var in PRAGMA_ENV_OVERRIDES.items():
+        value = os.getenv(env_var)
+        if value:
+            pragmas[name] = value
+    return pragmas
+
+def create_db_engine(url: str = None, profile: str = None, **engine_kwargs):
+    """
+    Create an engine for ``url`` whose connections use the given profile.
+    Pool sizing comes from the DB_POOL_* environment variables unless passed in.
+    """
+    url = url or get_database_url()
+    if not url.startswith("sqlite"):
+        return create_engine(url, **engine_kwargs)
+
+    connect_args = engine_kwargs.pop("connect_args", {})
+    connect_args.setdefault("check_same_thread", False)
+    if ":memory:" not in url and url != "sqlite://":
+        engine_kwargs.setdefault("pool_size", int(os.getenv("DB_POOL_SIZE", "10")))
+        engine_kwargs.setdefault("max_overflow", int(os.getenv("DB_MAX_OVERFLOW", "20")))
+        engine_kwargs.setdefault("pool_timeout", int(os.getenv("DB_POOL_TIMEOUT", "30")))
+
+    engine = create_engine(url, connect_args=connect_args, **engine_kwargs)
+    attach_pragmas(engine, get_pragmas(profile))
+    return engine
+
+def create_readonly_engine(url: str = None, profile: str = None, **engine_kwargs):
+    """
+    Create a separate engine for analytical and ad-hoc SQL access.
+    SQLite files are opened with the ``mode=ro`` URI and ``query_only`` so
+    writes are refused at the connection level, and the engine gets its own
+    bounded pool so heavy reads cannot exhaust the transactional pool.
+    """
+    url = url or get_database_url()
+    engine_kwargs.setdefault("pool_size", int(os.getenv("READONLY_POOL_SIZE", "5")))
+    engine_kwargs.setdefault("max_overflow", int(os.getenv("READONLY_MAX_OVERFLOW", "5")))
+    if not url.startswith("sqlite"):
+        return create_engine(url, **engine_kwargs)
+
+    database = make_url(url).database
+    if not database or database == ":memory:":
+        raise ValueError("A read-only engine needs a SQLite database file")
+
+    return create_db_engine(
+        f"sqlite:///file:{quote(database, safe='/:')}?mode=ro&uri=true",
+        profile=profile,
+        **engine_kwargs
+    )
+
+def attach_pragmas(engine, pragmas: dict):
+    """Apply ``pragmas`` to every new connection of ``engine``"""
+    readonly = "mode=ro" in str(engine.url)
+    if readonly:
+        pragmas = {name: value for name, value in pragmas.items() if name not in READONLY_SKIPPED_PRAGMAS}
+        pragmas["query_only"] = "ON"
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
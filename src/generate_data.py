@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for Campus Event Reporting System
+Builds databases of any size for load tests and benchmarks. Students get
+contiguous ids per college and every event samples its registrants from its
+college's id range, so no step rescans earlier rows. Rows are streamed into
+SQLite with executemany in fixed-size chunks, so memory stays flat and the
+run time grows linearly with the number of rows.
+
+Usage:
+    python generate_data.py --scale medium --db medium.db
+    python generate_data.py --db big.db --colleges 20 --students-per-college 5000 \\
+        --events-per-college 250 --registration-rate 0.24
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import NamedTuple
+
+from db_profile import create_db_engine, use_scratch_database
+
+# Keep the generator away from the configured database when main.py is imported
+use_scratch_database()
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import sessionmaker
+
+from main import (
+    Base, College, Student, Event, Registration, Attendance, Feedback,
+    EventStats, StudentActivity, ActivityRollup, EVENT_STATS_COUNTERS,
+    ROLLUP_GRANULARITIES, ROLLUP_METRICS,
+    aggregate_event_stats, aggregate_student_activity, count_activity_rollup, rollup_bucket_sql
+)
+from migrations import VERSION_TRIGGERS_MIGRATION, migrate
+
+class DataSpec(NamedTuple):
+    colleges: int
+    students_per_college: int
+    events_per_college: int
+    registration_rate: float  # share of a college's students registering for each event
+    attendance_rate: float  # share of registrants who check in to a past event
+    feedback_rate: float  # share of attendees who leave feedback
+    past_event_share: float = 0.6  # share of events that have already happened
+    seed: int = 42
+
+# Named sizes, by approximate total row count
+SCALES = {
+    "small": DataSpec(2, 80, 5, 0.8, 0.7, 0.5),  # ~1k rows
+    "medium": DataSpec(5, 1000, 40, 0.3, 0.7, 0.5),  # ~100k rows
+    "large": DataSpec(20, 5000, 250, 0.24, 0.7, 0.5),  # ~10M rows
+}
+
+CHUNK_SIZE = 50000
+
+# Mean delay between an event's announcement and a registration
+REGISTRATION_RUSH_MINUTES = 12 * 60
+
+# SQLAlchemy's DateTime storage format, so generated rows compare like API-written ones
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+class Clock:
+    """
+    Timestamps as whole minutes relative to ``origin``. Formatting is cached per
+    minute: millions of rows share a few hundred thousand distinct minutes.
+    """
+
+    def __init__(self, origin: datetime):
+        self.origin = origin.replace(second=0, microsecond=0)
+        self.format = lru_cache(maxsize=None)(self._format)
+
+    def _format(self, minute: int) -> str:
+        return (self.origin + timedelta(minutes=minute)).strftime(TIMESTAMP_FORMAT)
+
+class ChunkedWriter:
+    """Buffer rows per table and flush them with executemany every ``chunk_size`` rows"""
+
+    def __init__(self, engine, chunk_size: int = CHUNK_SIZE):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.buffers = {}
+        self.statements = {}
+        self.counts = {}
+
+    def add(self, model, row: tuple, columns: tuple):
+        table = model.__table__.name
+        if table not in self.buffers:
+            self.buffers[table] = []
+            self.counts[table] = 0
+            self.statements[table] = (
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            )
+        buffer = self.buffers[table]
+        buffer.append(row)
+        self.counts[table] += 1
+        if len(buffer) >= self.chunk_size:
+            self.flush(table)
+
+    def flush(self, table: str = None):
+        for name in [table] if table else list(self.buffers):
+            rows = self.buffers[name]
+            if not rows:
+                continue
+            with self.engine.begin() as connection:
+                connection.exec_driver_sql(self.statements[name], rows)
+            self.buffers[name] = []
+
+STUDENT_COLUMNS = ("id", "name", "email", "college_id", "created_at")
+EVENT_COLUMNS = ("id", "title", "description", "college_id", "start_time", "end_time",
+                 "location", "max_capacity", "is_cancelled", "created_at")
+REGISTRATION_COLUMNS = ("student_id", "event_id", "registered_at")
+ATTENDANCE_COLUMNS = ("student_id", "event_id", "checked_in_at")
+FEEDBACK_COLUMNS = ("student_id", "event_id", "rating", "comment", "submitted_at")
+
+def generate(engine, spec: DataSpec, chunk_size: int = CHUNK_SIZE, progress=None) -> dict:
+    """
+    Write ``spec``'s colleges, students, events and activity into ``engine``'s
+    (empty) database. Returns the number of rows written per table.
+    """
+    rng = random.Random(spec.seed)
+    clock = Clock(datetime.utcnow())
+    day = 24 * 60
+    created = clock.format(-365 * day)
+    writer = ChunkedWriter(engine, chunk_size)
+
+    # Students of college c have ids first_student[c] .. first_student[c] + students_per_college - 1
+    first_student = {}
+    for college_id in range(1, spec.colleges + 1):
+        writer.add(College, (college_id, f"College {college_id}", f"Campus {college_id}", created),
+                   ("id", "name", "location", "created_at"))
+        first_student[college_id] = (college_id - 1) * spec.students_per_college + 1
+        for offset in range(spec.students_per_college):
+            student_id = first_student[college_id] + offset
+            writer.add(Student, (student_id, f"Student {student_id}",
+                                 f"student{student_id}@college{college_id}.edu", college_id, created),
+                       STUDENT_COLUMNS)
+    writer.flush()
+
+    event_id = 0
+    for college_id in range(1, spec.colleges + 1):
+        college_students = range(first_student[college_id], first_student[college_id] + spec.students_per_college)
+        for number in range(1, spec.events_per_college + 1):
+            event_id += 1
+            # Minutes from now: past events ran up to six months ago, upcoming ones are up to three months out
+            if rng.random() < spec.past_event_share:
+                start = -rng.randint(1, 180) * day - rng.randint(0, 12) * 60
+            else:
+                start = rng.randint(1, 90) * day + rng.randint(0, 12) * 60
+            duration = rng.randint(1, 4) * 60
+            end = start + duration
+
+            expected = len(college_students) * spec.registration_rate * rng.uniform(0.75, 1.25)
+            registrants = rng.sample(college_students, min(len(college_students), round(expected)))
+            capacity = max(len(registrants), rng.randint(20, 100))
+            writer.add(Event, (event_id, f"College {college_id} Event {number}",
+                               f"Generated event {number} of college {college_id}", college_id,
+                               clock.format(start), clock.format(end),
+                               f"Campus {college_id} - Room {number}", capacity, False, created),
+                       EVENT_COLUMNS)
+
+            # Registration opens with the announcement and arrives in a rush that tails off.
+            # It closes when the event starts, and nobody registers in the future.
+            registration_close = min(start, 0)
+            announced = registration_close - rng.randint(3, 30) * day
+            held = end <= 0
+            for student_id in registrants:
+                delay = int(rng.expovariate(1 / REGISTRATION_RUSH_MINUTES))
+                registered_at = clock.format(min(announced + delay, registration_close - 1))
+                writer.add(Registration, (student_id, event_id, registered_at), REGISTRATION_COLUMNS)
+                if not held or rng.random() >= spec.attendance_rate:
+                    continue
+                # Check-in from 30 minutes early until the end of the event
+                checked_in_at = clock.format(start + rng.randint(-30, duration))
+                writer.add(Attendance, (student_id, event_id, checked_in_at), ATTENDANCE_COLUMNS)
+                if rng.random() < spec.feedback_rate:
+                    rating = rng.choices((1, 2, 3, 4, 5), weights=(1, 2, 4, 6, 4))[0]
+                    comment = f"Generated feedback from student {student_id}" if rng.random() < 0.3 else None
+                    submitted_at = clock.format(end + rng.randint(1, 24) * 60)
+                    writer.add(Feedback, (student_id, event_id, rating, comment, submitted_at),
+                               FEEDBACK_COLUMNS)
+        if progress:
+            progress(college_id, writer.counts)
+    writer.flush()
+    return dict(writer.counts)
+
+def populate_summaries(engine):
+    """
+    Fill the maintained summary tables of a freshly generated database with
+    INSERT ... SELECT, recounting from the base tables like the ``rebuild_*``
+    helpers do without loading every row into Python. Hourly and daily rollups
+    are summed from the 15-minute ones, whose buckets nest inside theirs.
+    """
+    Session = sessionmaker(bind=engine)
+    now = literal(datetime.utcnow())
+    rollup_columns = ["metric", "granularity", "event_id", "college_id", "bucket_start", "count"]
+    with Session() as db:
+        db.query(EventStats).delete()
+        db.query(StudentActivity).delete()
+        db.query(ActivityRollup).delete()
+
+        event_stats = aggregate_event_stats(db).add_columns(now).order_by(None).statement
+        db.execute(insert(EventStats).from_select(["event_id", *EVENT_STATS_COUNTERS, "updated_at"], event_stats))
+        db.commit()
+
+        student_activity = aggregate_student_activity(db).add_columns(now).order_by(None).statement
+        db.execute(insert(StudentActivity).from_select(
+            ["student_id", "college_id", "attended_count", "updated_at"], student_activity
+        ))
+        db.commit()
+
+        for metric in ROLLUP_METRICS:
+            counts = count_activity_rollup(db, metric, "15m").subquery()
+            db.execute(insert(ActivityRollup).from_select(rollup_columns, select(
+                literal(metric), literal("15m"), counts.c.event_id, counts.c.college_id,
+                counts.c.bucket_start, counts.c["count"],
+            )))
+            for granularity in ROLLUP_GRANULARITIES:
+                if granularity == "15m":
+                    continue
+                bucket = rollup_bucket_sql(ActivityRollup.bucket_start, granularity)
+                db.execute(insert(ActivityRollup).from_select(rollup_columns, select(
+                    literal(metric), literal(granularity), ActivityRollup.event_id, ActivityRollup.college_id,
+                    bucket, func.sum(ActivityRollup.count),
+                ).where(
+                    ActivityRollup.metric == metric, ActivityRollup.granularity == "15m"
+                ).group_by(ActivityRollup.event_id, bucket)))
+            db.commit()
+
+def create_database(path: str, spec: DataSpec, chunk_size: int = CHUNK_SIZE, progress=None) -> dict:
+    """Create a new database file at ``path`` populated from ``spec``"""
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists")
+    engine = create_db_engine(f"sqlite:///{path}")
+    try:
+        Base.metadata.create_all(bind=engine)
+        migrate(engine, VERSION_TRIGGERS_MIGRATION - 1)
+        counts = generate(engine, spec, chunk_size, progress)
+        populate_summaries(engine)
+        migrate(engine)
+        with engine.connect() as connection:
+            # Fold the write-ahead log back into the file so it can be copied on its own
+            connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        return counts
+    finally:
+        engine.dispose()
+
+def remove_database(path: str):
+    """Delete a database file together with its WAL and shared-memory files"""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic campus events database")
+    parser.add_argument("--db", default="campus_events.db", help="database file to create")
+    parser.add_argument("--scale", choices=SCALES, default="small", help="named size to start from")
+    parser.add_argument("--colleges", type=int)
+    parser.add_argument("--students-per-college", type=int)
+    parser.add_argument("--events-per-college", type=int)
+    parser.add_argument("--registration-rate", type=float, help="share of a college's students per event")
+    parser.add_argument("--attendance-rate", type=float, help="share of registrants who attend past events")
+    parser.add_argument("--feedback-rate", type=float, help="share of attendees who leave feedback")
+    parser.add_argument("--past-event-share", type=float, help="share of events already held")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per executemany")
+    parser.add_argument("--overwrite", action="store_true", help="replace an existing database file")
+    args = parser.parse_args()
+
+    overrides = {
+        field: getattr(args, field) for field in DataSpec._fields if getattr(args, field) is not None
+    }
+    spec = SCALES[args.scale]._replace(**overrides)
+    if os.path.exists(args.db):
+        if not args.overwrite:
+            print(f"❌ {args.db} already exists (use --overwrite to replace it)")
+            return 1
+        remove_database(args.db)
+
+    print(f"🔄 Generating {args.db}: {spec.colleges} colleges x {spec.students_per_college} students, "
+          f"{spec.events_per_college} events each (seed {spec.seed})")
+    started = time.perf_counter()
+
+    def progress(college_id, counts):
+        print(f"   College {college_id}/{spec.colleges}: {sum(counts.values())} rows "
+              f"({time.perf_counter() - started:.1f}s)")
+
+    counts = create_database(args.db, spec, args.chunk_size, progress if spec.colleges > 1 else None)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Wrote {sum(counts.values())} rows in {elapsed:.1f}s "
+          f"({sum(counts.values()) / elapsed:,.0f} rows/s), summaries rebuilt")
+    for table, count in counts.items():
+        print(f"   - {table}: {count}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
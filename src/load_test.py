@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for Campus Event Reporting System
+Drives the API with concurrent virtual users running a weighted mix of
+scenarios and reports throughput, latency percentiles and error rates as JSON,
+so runs can be compared. By default the FastAPI app runs in-process over the
+ASGI transport against a throwaway database; --base-url targets a running
+server instead.
+
+Every run first creates its own college, students and events through the API:
+upcoming events for the registration rush and one event that is open for
+check-in, with every student registered.
+
+Usage:
+    python load_test.py                                   # mixed load, in-process, empty database
+    python load_test.py --mix registration_rush --concurrency 50 --duration 20
+    python load_test.py --mix check_in_surge=3,dashboard_polling=1 --snapshot medium
+    python load_test.py --base-url http://localhost:8000 --output run.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+
+import httpx
+
+from run_sql_queries import STANDARD_REPORTS
+
+SCENARIOS = ("registration_rush", "check_in_surge", "dashboard_polling", "adhoc_sql")
+
+# Named mixes: scenario -> relative weight
+MIXES = {
+    "mixed": {"registration_rush": 2, "check_in_surge": 3, "dashboard_polling": 4, "adhoc_sql": 1},
+    "registration_rush": {"registration_rush": 8, "dashboard_polling": 2},
+    "check_in_surge": {"check_in_surge": 8, "dashboard_polling": 2},
+    "dashboard_polling": {"dashboard_polling": 1},
+    "adhoc_sql": {"adhoc_sql": 1},
+}
+
+# Statuses each scenario expects; anything else (or no response) is an error.
+# Duplicate registrations and check-ins are rejected with 400 once the pool runs out.
+EXPECTED_STATUSES = {
+    "registration_rush": {200, 400},
+    "check_in_surge": {200, 400},
+    "dashboard_polling": {200, 304},
+    "adhoc_sql": {200},
+}
+
+MAX_ERROR_SAMPLES = 5
+
+def parse_mix(value: str) -> dict:
+    """Return the weights of a named mix or of ``scenario=weight,...``"""
+    if value in MIXES:
+        return dict(MIXES[value])
+    weights = {}
+    for part in value.split(","):
+        scenario, _, weight = part.partition("=")
+        scenario = scenario.strip()
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {scenario} (choose from {', '.join(SCENARIOS)})")
+        weights[scenario] = float(weight or 1)
+    return weights
+
+def percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+class Recorder:
+    """Collect latency and status per scenario"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+        self.error_samples = []
+
+    def record(self, scenario: str, seconds: float, status, detail: str = None):
+        self.latencies[scenario].append(seconds * 1000)
+        self.statuses[scenario][str(status)] += 1
+        if status not in EXPECTED_STATUSES[scenario]:
+            self.errors[scenario] += 1
+            if len(self.error_samples) < MAX_ERROR_SAMPLES:
+                self.error_samples.append({"scenario": scenario, "status": status, "detail": detail})
+
+    @staticmethod
+    def _summary(latencies: list, errors: int, elapsed: float) -> dict:
+        ordered = sorted(latencies)
+        return {
+            "requests": len(ordered),
+            "errors": errors,
+            "error_rate": round(errors / len(ordered), 4) if ordered else 0.0,
+            "throughput_rps": round(len(ordered) / elapsed, 1),
+            "latency_ms": {
+                "mean": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+                "p50": round(percentile(ordered, 50), 2),
+                "p95": round(percentile(ordered, 95), 2),
+                "p99": round(percentile(ordered, 99), 2),
+                "max": round(ordered[-1], 2) if ordered else 0.0,
+            },
+        }
+
+    def report(self, elapsed: float) -> dict:
+        scenarios = {
+            scenario: {**self._summary(latencies, self.errors[scenario], elapsed),
+                       "status_codes": dict(self.statuses[scenario])}
+            for scenario, latencies in sorted(self.latencies.items())
+        }
+        everything = [value for latencies in self.latencies.values() for value in latencies]
+        return {
+            "overall": self._summary(everything, sum(self.errors.values()), elapsed),
+            "scenarios": scenarios,
+            "error_samples": self.error_samples,
+        }
+
+class LoadFixture:
+    """The college, students and events a run works on, created through the API"""
+
+    def __init__(self, students: int, events: int):
+        self.num_students = students
+        self.num_events = events
+        self.college_id = None
+        self.student_ids = []
+        self.upcoming_event_ids = []
+        self.live_event_id = None
+        self.pending_registrations = []
+        self.pending_check_ins = []
+
+    async def create(self, client: httpx.AsyncClient, rng: random.Random):
+        run = uuid.uuid4().hex[:8]
+        response = await client.post("/colleges/", json={"name": f"Load Test College {run}", "location": "Load Lab"})
+        response.raise_for_status()
+        self.college_id = response.json()["id"]
+
+        for i in range(self.num_students):
+            response = await client.post("/students/", json={
+                "name": f"Load Student {i}", "email": f"load{i}.{run}@loadtest.edu", "college_id": self.college_id
+            })
+            response.raise_for_status()
+            self.student_ids.append(response.json()["id"])
+
+        now = datetime.utcnow()
+        for i in range(self.num_events):
+            start = now + timedelta(days=7, hours=i)
+            self.upcoming_event_ids.append(await self._create_event(client, f"Upcoming {i} ({run})", start))
+        # Starts in 20 minutes: registration is still open and check-in already is
+        self.live_event_id = await self._create_event(client, f"Live ({run})", now + timedelta(minutes=20))
+        response = await client.post("/registrations/batch", json={
+            "event_id": self.live_event_id, "student_ids": self.student_ids
+        })
+        response.raise_for_status()
+
+        # Each virtual user takes the next unused pair, so early requests mostly succeed
+        self.pending_registrations = [
+            (student_id, event_id) for student_id in self.student_ids for event_id in self.upcoming_event_ids
+        ]
+        rng.shuffle(self.pending_registrations)
+        self.pending_check_ins = list(self.student_ids)
+        rng.shuffle(self.pending_check_ins)
+
+    async def _create_event(self, client, title, start):
+        response = await client.post("/events/", json={
+            "title": title, "description": "Load test event", "college_id": self.college_id,
+            "start_time": start.isoformat(), "end_time": (start + timedelta(hours=3)).isoformat(),
+            "location": "Load Lab", "max_capacity": self.num_students,
+        })
+        response.raise_for_status()
+        return response.json()["id"]
+
+class VirtualUser:
+    """One concurrent client running scenarios picked by weight"""
+
+    def __init__(self, client, fixture: LoadFixture, recorder: Recorder, weights: dict, rng: random.Random):
+        self.client = client
+        self.fixture = fixture
+        self.recorder = recorder
+        self.scenarios = list(weights)
+        self.weights = list(weights.values())
+        self.rng = rng
+        # Dashboards revalidate what they already show
+        self.etags = {}
+
+    async def run(self, deadline: float):
+        while time.perf_counter() < deadline:
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            await getattr(self, scenario)()
+
+    async def request(self, scenario: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(scenario, time.perf_counter() - started, "exception", repr(e))
+            return None
+        elapsed = time.perf_counter() - started
+        detail = None if response.status_code in EXPECTED_STATUSES[scenario] else response.text[:200]
+        self.recorder.record(scenario, elapsed, response.status_code, detail)
+        return response
+
+    async def registration_rush(self):
+        fixture = self.fixture
+        if fixture.pending_registrations:
+            student_id, event_id = fixture.pending_registrations.pop()
+        else:
+            student_id = self.rng.choice(fixture.student_ids)
+            event_id = self.rng.choice(fixture.upcoming_event_ids)
+        await self.request("registration_rush", "POST", "/registrations/",
+                           json={"student_id": student_id, "event_id": event_id})
+
+    async def check_in_surge(self):
+        fixture = self.fixture
+        if fixture.pending_check_ins:
+            student_id = fixture.pending_check_ins.pop()
+        else:
+            student_id = self.rng.choice(fixture.student_ids)
+        await self.request("check_in_surge", "POST", "/attendance/",
+                           json={"student_id": student_id, "event_id": fixture.live_event_id})
+
+    async def dashboard_polling(self):
+        fixture = self.fixture
+        url = self.rng.choice((
+            f"/reports/events/{fixture.live_event_id}",
+            f"/reports/events/{self.rng.choice(fixture.upcoming_event_ids)}",
+            f"/reports/colleges/{fixture.college_id}/events",
+            f"/leaderboard/students?college_id={fixture.college_id}&n=10",
+            f"/reports/timeseries?metric=attendance&bucket=15m&event_id={fixture.live_event_id}",
+        ))
+        headers = {"If-None-Match": self.etags[url]} if url in self.etags else {}
+        response = await self.request("dashboard_polling", "GET", url, headers=headers)
+        if response is not None and response.headers.get("etag"):
+            self.etags[url] = response.headers["etag"]
+
+    async def adhoc_sql(self):
+        _, _, query = self.rng.choice(STANDARD_REPORTS)
+        await self.request("adhoc_sql", "POST", "/execute-sql",
+                           json={"query": query.replace(":college_id", str(self.fixture.college_id))})
+
+async def run_load(client, weights: dict, concurrency: int, duration: float,
+                   students: int, events: int, seed: int) -> dict:
+    """Create the fixture, run ``concurrency`` virtual users for ``duration`` seconds and report"""
+    rng = random.Random(seed)
+    fixture = LoadFixture(students, events)
+    await fixture.create(client, rng)
+
+    recorder = Recorder()
+    users = [VirtualUser(client, fixture, recorder, weights, random.Random(rng.random())) for _ in range(concurrency)]
+    started = time.perf_counter()
+    await asyncio.gather(*(user.run(started + duration) for user in users))
+    return recorder.report(time.perf_counter() - started)
+
+async def run_against_server(base_url: str, **options) -> dict:
+    limits = httpx.Limits(max_connections=options["concurrency"])
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        return await run_load(client, **options)
+
+async def run_in_process(**options) -> dict:
+    # main.py binds its engine to DATABASE_URL on import, so it is imported once that is set
+    import main
+
+    # The ASGI transport does not send lifespan events; run the startup hooks here
+    await main.app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=60) as client:
+            return await run_load(client, **options)
+    finally:
+        await main.app.router.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with weighted scenario mixes")
+    parser.add_argument("--mix", default="mixed",
+                        help=f"named mix ({', '.join(MIXES)}) or scenario=weight,... ({', '.join(SCENARIOS)})")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--students", type=int, default=200, help="students created for the run")
+    parser.add_argument("--events", type=int, default=10, help="upcoming events created for the run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app")
+    data = parser.add_mutually_exclusive_group()
+    data.add_argument("--snapshot", help="in-process: start from a copy of this snapshot")
+    data.add_argument("--scale", choices=("small", "medium", "large"),
+                      help="in-process: start from a generated scale (snapshotted on first use)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--json", action="store_true", help="print only the JSON report")
+    args = parser.parse_args()
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    options = {
+        "weights": weights, "concurrency": args.concurrency, "duration": args.duration,
+        "students": args.students, "events": args.events, "seed": args.seed,
+    }
+
+    with ExitStack() as stack:
+        if args.base_url:
+            target = args.base_url
+        else:
+            if args.snapshot or args.scale:
+                from snapshots import ensure_snapshot, restored_database
+                if args.scale:
+                    ensure_snapshot(args.scale)
+                path = stack.enter_context(restored_database(args.snapshot or args.scale))
+            else:
+                path = os.path.join(stack.enter_context(tempfile.TemporaryDirectory()), "load_test.db")
+            os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+            target = f"in-process ({args.snapshot or args.scale or 'empty database'})"
+
+        if not args.json:
+            print(f"🔄 Load testing {target}: {args.concurrency} users for {args.duration:g}s, mix {weights}")
+        if args.base_url:
+            results = asyncio.run(run_against_server(args.base_url, **options))
+        else:
+            results = asyncio.run(run_in_process(**options))
+
+    report = {
+        "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "target": target,
+        "mix": weights,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "seed": args.seed,
+        **results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    overall = results["overall"]
+    print(f"\n{'scenario':<20} {'requests':>9} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>8}")
+    print("-" * 76)
+    for name, summary in [*results["scenarios"].items(), ("overall", overall)]:
+        latency = summary["latency_ms"]
+        print(f"{name:<20} {summary['requests']:>9} {summary['throughput_rps']:>8} "
+              f"{latency['p50']:>7}ms {latency['p95']:>7}ms {latency['p99']:>7}ms {summary['error_rate']:>7.1%}")
+    for sample in results["error_samples"]:
+        print(f"❌ {sample['scenario']}: {sample['status']} {sample['detail']}")
+    if args.output:
+        print(f"\n✅ Report written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
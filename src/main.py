@@ -1,17 +1,35 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Float, ForeignKey, text
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey, Index, bindparam, cast, text, func, select, exists, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
 from pydantic import BaseModel, Field
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Dict, Any, Literal
+from collections import Counter
+import anyio
+import csv
+import hashlib
+import io
+import json
 import os
+import threading
 import time
+import uuid
 
-# Database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./campus_events.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+from db_profile import create_db_engine, create_readonly_engine, get_database_url
+from metrics import MetricsMiddleware, MetricsRegistry, instrument_engine, record_statement
+from migrations import migrate
+from query_advisor import advise
+from query_cache import QueryResultCache, normalize_query, referenced_tables
+
+# Database setup (engine profile and pool sizing are configured in db_profile.py)
+SQLALCHEMY_DATABASE_URL = get_database_url()
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -33,7 +51,7 @@ class Student(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     email = Column(String, unique=True, index=True)
-    college_id = Column(Integer, ForeignKey("colleges.id"))
+    college_id = Column(Integer, ForeignKey("colleges.id"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     college = relationship("College", back_populates="students")
@@ -48,17 +66,21 @@ class Event(Base):
     title = Column(String, index=True)
     description = Column(String)
     college_id = Column(Integer, ForeignKey("colleges.id"))
-    start_time = Column(DateTime)
+    start_time = Column(DateTime, index=True)
     end_time = Column(DateTime)
     location = Column(String)
     max_capacity = Column(Integer)
-    is_cancelled = Column(Boolean, default=False)
+    is_cancelled = Column(Boolean, default=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     college = relationship("College", back_populates="events")
     registrations = relationship("Registration", back_populates="event")
     attendance = relationship("Attendance", back_populates="event")
     feedback = relationship("Feedback", back_populates="event")
+    
+    __table_args__ = (
+        Index("ix_events_college_start", "college_id", "start_time"),
+    )
 
 class Registration(Base):
     __tablename__ = "registrations"
@@ -70,6 +92,11 @@ class Registration(Base):
     
     student = relationship("Student", back_populates="registrations")
     event = relationship("Event", back_populates="registrations")
+    
+    __table_args__ = (
+        Index("uq_registrations_student_event", "student_id", "event_id", unique=True),
+        Index("ix_registrations_event_student", "event_id", "student_id"),
+    )
 
 class Attendance(Base):
     __tablename__ = "attendance"
@@ -81,6 +108,11 @@ class Attendance(Base):
     
     student = relationship("Student", back_populates="attendance")
     event = relationship("Event", back_populates="attendance")
+    
+    __table_args__ = (
+        Index("ix_attendance_event_student", "event_id", "student_id"),
+        Index("uq_attendance_student_event", "student_id", "event_id", unique=True),
+    )
 
 class Feedback(Base):
     __tablename__ = "feedback"
@@ -94,10 +126,70 @@ class Feedback(Base):
     
     student = relationship("Student", back_populates="feedback")
     event = relationship("Event", back_populates="feedback")
+    
+    __table_args__ = (
+        Index("ix_feedback_event_student", "event_id", "student_id"),
+        Index("ix_feedback_student_rating", "student_id", "rating"),
+    )
+
+class EventStats(Base):
+    __tablename__ = "event_stats"
+    
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    registration_count = Column(Integer, default=0, nullable=False)
+    attendance_count = Column(Integer, default=0, nullable=False)
+    feedback_count = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class StudentActivity(Base):
+    __tablename__ = "student_activity"
+    
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    college_id = Column(Integer, ForeignKey("colleges.id"))
+    attended_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Leaderboard reads walk these in order: most attended first, ties by student id
+Index(
+    "ix_student_activity_college_rank",
+    StudentActivity.college_id, StudentActivity.attended_count.desc(), StudentActivity.student_id
+)
+Index("ix_student_activity_rank", StudentActivity.attended_count.desc(), StudentActivity.student_id)
+
+class ActivityRollup(Base):
+    __tablename__ = "activity_rollups"
+    
+    metric = Column(String, primary_key=True)  # registrations or attendance
+    granularity = Column(String, primary_key=True)  # 15m, hour or day
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    college_id = Column(Integer, ForeignKey("colleges.id"))
+    count = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_activity_rollups_college", "metric", "granularity", "college_id", "bucket_start"),
+        Index("ix_activity_rollups_bucket", "metric", "granularity", "bucket_start"),
+    )
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
+# create_all never adds indexes to existing tables; migrations bring older databases up to date
+migrate(engine)
+
+# Analytical endpoints get their own read-only pool so they never compete with
+# (or write through) the transactional connections
+readonly_engine = create_readonly_engine(SQLALCHEMY_DATABASE_URL)
+ReadOnlySessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=readonly_engine)
+
+# Cached /execute-sql results are only served while the stored write versions
+# (see read_table_versions) of the tables they read are unchanged
+sql_result_cache = QueryResultCache(
+    max_entries=int(os.getenv("SQL_CACHE_SIZE", "128")),
+    max_rows=int(os.getenv("SQL_CACHE_MAX_ROWS", "10000")),
+)
+
 # Pydantic Models
 class CollegeCreate(BaseModel):
     name: str
@@ -155,10 +247,45 @@ class RegistrationCreate(BaseModel):
     student_id: int
     event_id: int
 
+class RegistrationBatch(BaseModel):
+    # Either one event and many students, or explicit (student, event) pairs, or both
+    event_id: Optional[int] = None
+    student_ids: List[int] = Field(default_factory=list, max_length=5000)
+    registrations: List[RegistrationCreate] = Field(default_factory=list, max_length=5000)
+
+class RegistrationRejection(BaseModel):
+    student_id: int
+    event_id: int
+    reason: str
+    detail: str
+
+class RegistrationBatchResponse(BaseModel):
+    registered: List[RegistrationCreate]
+    rejected: List[RegistrationRejection]
+
 class AttendanceCreate(BaseModel):
     student_id: int
     event_id: int
 
+class AttendanceScan(BaseModel):
+    student_id: int
+    event_id: int
+    # When the scanner read the badge; offline scanners upload their backlog with it
+    scanned_at: Optional[datetime] = None
+
+class AttendanceBatch(BaseModel):
+    records: List[AttendanceScan] = Field(..., max_length=5000)
+
+class AttendanceScanResult(BaseModel):
+    student_id: int
+    event_id: int
+    status: str
+    detail: Optional[str] = None
+
+class AttendanceBatchResponse(BaseModel):
+    checked_in: int
+    results: List[AttendanceScanResult]
+
 class FeedbackCreate(BaseModel):
     student_id: int
     event_id: int
@@ -181,15 +308,51 @@ class StudentReport(BaseModel):
     total_events_attended: int
     average_feedback_given: Optional[float]
 
+class LeaderboardEntry(BaseModel):
+    rank: int
+    student_id: int
+    student_name: str
+    college_id: Optional[int]
+    attended_count: int
+
+class TimeseriesPoint(BaseModel):
+    bucket_start: datetime
+    count: int
+
+class TimeseriesResponse(BaseModel):
+    metric: str
+    bucket: str
+    event_id: Optional[int] = None
+    college_id: Optional[int] = None
+    points: List[TimeseriesPoint]
+
 # SQL Query Models
 class SQLQueryRequest(BaseModel):
     query: str
+    # Opt-in streaming: rows are sent as NDJSON or CSV while the cursor produces them
+    stream_format: Optional[Literal["ndjson", "csv"]] = None
+    # Client-chosen id so the query can be cancelled while it runs
+    query_id: Optional[str] = Field(None, max_length=64)
+    # Per-request limits; both are capped by the server-wide maximums
+    timeout_seconds: Optional[float] = Field(None, gt=0)
+    max_rows: Optional[int] = Field(None, ge=1)
 
 class SQLQueryResponse(BaseModel):
     columns: List[str]
     rows: List[List[Any]]
     row_count: int
     execution_time: float
+    cached: bool = False
+    truncated: bool = False
+    query_id: Optional[str] = None
+
+class SQLExplainRequest(BaseModel):
+    query: str
+
+class SQLExplainResponse(BaseModel):
+    plan: List[Dict[str, Any]]
+    full_scans: List[Dict[str, Any]]
+    suggestions: List[Dict[str, Any]]
 
 # FastAPI app
 app = FastAPI(title="Campus Event Reporting System", version="1.0.0")
@@ -201,8 +364,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-After", "ETag", "X-Query-Id"],
 )
 
+# Per-route request counts, latency and SQL statements, served at /metrics
+metrics = MetricsRegistry()
+instrument_engine(engine, metrics)
+instrument_engine(readonly_engine, metrics)
+app.add_middleware(MetricsMiddleware, registry=metrics, router=app.router)
+
+# Endpoints that touch the database are plain ``def`` functions: FastAPI runs them
+# in a worker thread pool so blocking SQLite calls never stall the event loop.
+# DB_THREAD_POOL_SIZE bounds how many of them run at once.
+DB_THREAD_POOL_SIZE = int(os.getenv("DB_THREAD_POOL_SIZE", "40"))
+
+@app.on_event("startup")
+async def configure_thread_pool():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = DB_THREAD_POOL_SIZE
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
@@ -211,25 +390,613 @@ def get_db():
     finally:
         db.close()
 
+# Dependency to get a read-only session for ad-hoc SQL and reporting
+def get_readonly_db():
+    db = ReadOnlySessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 # Utility functions
-def is_event_active(event: Event) -> bool:
-    """Check if event is currently active (within ±30 min of event time)"""
-    now = datetime.utcnow()
+def is_event_active(event: Event, at: Optional[datetime] = None) -> bool:
+    """Check if event is active at ``at`` (default: now), i.e. within ±30 min of event time"""
+    now = at or datetime.utcnow()
     return (event.start_time - timedelta(minutes=30) <= now <= event.end_time + timedelta(minutes=30))
 
 def is_registration_open(event: Event) -> bool:
     """Check if registration is still open (before event starts)"""
     return datetime.utcnow() < event.start_time
 
+def aggregate_event_stats(db: Session, *criteria):
+    """
+    Build a query that recounts event statistics from the base tables.
+    Each child table is aggregated per event and outer-joined back onto events,
+    so the number of round trips does not grow with the number of events.
+    """
+    registrations = (
+        db.query(Registration.event_id, func.count(Registration.id).label("total"))
+        .join(Event, Event.id == Registration.event_id)
+        .filter(*criteria)
+        .group_by(Registration.event_id)
+        .subquery()
+    )
+    attendance = (
+        db.query(Attendance.event_id, func.count(Attendance.id).label("total"))
+        .join(Event, Event.id == Attendance.event_id)
+        .filter(*criteria)
+        .group_by(Attendance.event_id)
+        .subquery()
+    )
+    feedback = (
+        db.query(
+            Feedback.event_id,
+            func.count(Feedback.id).label("total"),
+            func.sum(Feedback.rating).label("rating_sum"),
+        )
+        .join(Event, Event.id == Feedback.event_id)
+        .filter(*criteria)
+        .group_by(Feedback.event_id)
+        .subquery()
+    )
+    
+    return (
+        db.query(
+            Event.id.label("event_id"),
+            func.coalesce(registrations.c.total, 0).label("registration_count"),
+            func.coalesce(attendance.c.total, 0).label("attendance_count"),
+            func.coalesce(feedback.c.total, 0).label("feedback_count"),
+            func.coalesce(feedback.c.rating_sum, 0).label("rating_sum"),
+        )
+        .outerjoin(registrations, registrations.c.event_id == Event.id)
+        .outerjoin(attendance, attendance.c.event_id == Event.id)
+        .outerjoin(feedback, feedback.c.event_id == Event.id)
+        .filter(*criteria)
+        .order_by(Event.id)
+    )
+
+EVENT_STATS_COUNTERS = ("registration_count", "attendance_count", "feedback_count", "rating_sum")
+
+def ensure_event_stats(db: Session, *criteria) -> int:
+    """
+    Create missing event_stats rows for matching events from the base tables.
+    Rows a concurrent request created first are left alone. Returns how many
+    rows this call created.
+    """
+    missing = [
+        event_id for (event_id,) in db.query(Event.id)
+        .outerjoin(EventStats, EventStats.event_id == Event.id)
+        .filter(EventStats.event_id.is_(None), *criteria)
+        .all()
+    ]
+    now = datetime.utcnow()
+    statement = (
+        sqlite_insert(EventStats)
+        .on_conflict_do_nothing(index_elements=["event_id"])
+        .returning(EventStats.event_id)
+    )
+    created = 0
+    for i in range(0, len(missing), 500):
+        rows = [
+            dict(row._asdict(), updated_at=now)
+            for row in aggregate_event_stats(db, Event.id.in_(missing[i:i + 500])).all()
+        ]
+        if rows:
+            created += len(db.execute(statement, rows).all())
+    return created
+
+def bump_event_stats(db: Session, event_id: int, **deltas: int):
+    """Apply counter deltas to an event's statistics in the caller's transaction"""
+    stats = db.query(EventStats).filter(EventStats.event_id == event_id)
+    counters = {getattr(EventStats, name): getattr(EventStats, name) + delta for name, delta in deltas.items()}
+    if stats.update(counters, synchronize_session=False):
+        return
+    # No row yet: recounting from the base tables already includes this write
+    db.flush()
+    if not ensure_event_stats(db, Event.id == event_id):
+        # Another request created the row first, counting only committed writes
+        stats.update(counters, synchronize_session=False)
+
+def rebuild_event_stats(db: Session, verify_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    Recompute every event's statistics from the base tables and report drift.
+    Unless ``verify_only`` is set, drifted or missing rows are rewritten.
+    """
+    stored = {stats.event_id: stats for stats in db.query(EventStats).all()}
+    drift = []
+    for row in aggregate_event_stats(db).all():
+        actual = row._asdict()
+        stats = stored.get(row.event_id)
+        for name in EVENT_STATS_COUNTERS:
+            recorded = getattr(stats, name) if stats else None
+            if recorded != actual[name]:
+                drift.append({
+                    "event_id": row.event_id,
+                    "counter": name,
+                    "stored": recorded,
+                    "actual": actual[name],
+                })
+        if verify_only:
+            continue
+        if stats is None:
+            db.add(EventStats(**actual))
+        elif any(getattr(stats, name) != actual[name] for name in EVENT_STATS_COUNTERS):
+            for name in EVENT_STATS_COUNTERS:
+                setattr(stats, name, actual[name])
+    if not verify_only:
+        db.commit()
+    return drift
+
+def aggregate_student_activity(db: Session, *criteria):
+    """Build a query that recounts attended events per student from the base tables"""
+    attendance = (
+        db.query(Attendance.student_id, func.count(Attendance.id).label("total"))
+        .join(Student, Student.id == Attendance.student_id)
+        .filter(*criteria)
+        .group_by(Attendance.student_id)
+        .subquery()
+    )
+    return (
+        db.query(
+            Student.id.label("student_id"),
+            Student.college_id,
+            func.coalesce(attendance.c.total, 0).label("attended_count"),
+        )
+        .outerjoin(attendance, attendance.c.student_id == Student.id)
+        .filter(*criteria)
+        .order_by(Student.id)
+    )
+
+def ensure_student_activity(db: Session, *criteria) -> int:
+    """
+    Create missing student_activity rows for matching students from the base
+    tables. Rows a concurrent request created first are left alone. Returns how
+    many rows this call created.
+    """
+    missing = [
+        student_id for (student_id,) in db.query(Student.id)
+        .outerjoin(StudentActivity, StudentActivity.student_id == Student.id)
+        .filter(StudentActivity.student_id.is_(None), *criteria)
+        .all()
+    ]
+    now = datetime.utcnow()
+    statement = (
+        sqlite_insert(StudentActivity)
+        .on_conflict_do_nothing(index_elements=["student_id"])
+        .returning(StudentActivity.student_id)
+    )
+    created = 0
+    for i in range(0, len(missing), 500):
+        rows = [
+            dict(row._asdict(), updated_at=now)
+            for row in aggregate_student_activity(db, Student.id.in_(missing[i:i + 500])).all()
+        ]
+        if rows:
+            created += len(db.execute(statement, rows).all())
+    return created
+
+def bump_student_activity(db: Session, attended: Dict[int, int]):
+    """Add newly attended events per student in the caller's transaction"""
+    if not attended:
+        return
+    table = StudentActivity.__table__
+    statement = (
+        table.update()
+        .where(table.c.student_id == bindparam("b_student_id"))
+        .values(
+            attended_count=table.c.attended_count + bindparam("b_count"),
+            updated_at=datetime.utcnow()
+        )
+    )
+    result = db.execute(statement, [
+        {"b_student_id": student_id, "b_count": count} for student_id, count in attended.items()
+    ])
+    if result.rowcount != len(attended):
+        # Students without a row yet are recounted, which already includes this write
+        db.flush()
+        ensure_student_activity(db, Student.id.in_(list(attended)))
+
+def rebuild_student_activity(db: Session, verify_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    Recompute every student's attended count from the base tables and report drift.
+    Unless ``verify_only`` is set, drifted or missing rows are rewritten.
+    """
+    stored = {activity.student_id: activity for activity in db.query(StudentActivity).all()}
+    drift = []
+    for row in aggregate_student_activity(db).all():
+        activity = stored.get(row.student_id)
+        recorded = activity.attended_count if activity else None
+        if recorded != row.attended_count:
+            drift.append({
+                "student_id": row.student_id,
+                "counter": "attended_count",
+                "stored": recorded,
+                "actual": row.attended_count,
+            })
+        if verify_only:
+            continue
+        if activity is None:
+            db.add(StudentActivity(**row._asdict()))
+        elif recorded != row.attended_count or activity.college_id != row.college_id:
+            activity.attended_count = row.attended_count
+            activity.college_id = row.college_id
+    if not verify_only:
+        db.commit()
+    return drift
+
+# Rollup buckets: how to truncate a timestamp in Python and in SQLite
+ROLLUP_METRICS = {
+    "registrations": (Registration, Registration.registered_at),
+    "attendance": (Attendance, Attendance.checked_in_at),
+}
+ROLLUP_GRANULARITIES = {
+    "15m": timedelta(minutes=15),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+def rollup_bucket(timestamp: datetime, granularity: str) -> datetime:
+    """Truncate ``timestamp`` to the start of its bucket"""
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=timestamp.minute - timestamp.minute % 15, second=0, microsecond=0)
+
+def rollup_bucket_sql(column, granularity: str):
+    """SQLite expression for ``rollup_bucket`` in SQLAlchemy's DateTime storage format"""
+    if granularity == "day":
+        return func.strftime("%Y-%m-%d 00:00:00.000000", column, type_=String)
+    if granularity == "hour":
+        return func.strftime("%Y-%m-%d %H:00:00.000000", column, type_=String)
+    quarter = func.printf("%02d", cast(func.strftime("%M", column), Integer) // 15 * 15, type_=String)
+    return func.strftime("%Y-%m-%d %H:", column, type_=String) + quarter + ":00.000000"
+
+def bump_activity_rollups(db: Session, metric: str, writes):
+    """
+    Count new ``(event_id, timestamp)`` writes into every rollup granularity,
+    in the caller's transaction. The college is looked up inside the upsert.
+    """
+    deltas = Counter(
+        (event_id, granularity, rollup_bucket(timestamp, granularity))
+        for event_id, timestamp in writes
+        for granularity in ROLLUP_GRANULARITIES
+    )
+    if not deltas:
+        return
+    statement = sqlite_insert(ActivityRollup).values(
+        metric=metric,
+        granularity=bindparam("b_granularity"),
+        event_id=bindparam("b_event_id"),
+        bucket_start=bindparam("b_bucket_start", type_=DateTime),
+        college_id=select(Event.college_id).where(Event.id == bindparam("b_event_id")).scalar_subquery(),
+        count=bindparam("b_count"),
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["metric", "granularity", "event_id", "bucket_start"],
+        set_={"count": ActivityRollup.count + statement.excluded.count},
+    )
+    db.execute(statement, [
+        {"b_event_id": event_id, "b_granularity": granularity, "b_bucket_start": bucket_start, "b_count": count}
+        for (event_id, granularity, bucket_start), count in deltas.items()
+    ])
+
+def count_activity_rollup(db: Session, metric: str, granularity: str):
+    """Build a query that recounts one metric's rollup at one granularity"""
+    model, timestamp = ROLLUP_METRICS[metric]
+    bucket = rollup_bucket_sql(timestamp, granularity)
+    return (
+        db.query(
+            model.event_id,
+            Event.college_id,
+            bucket.label("bucket_start"),
+            func.count(model.id).label("count"),
+        )
+        .join(Event, Event.id == model.event_id)
+        .filter(timestamp.isnot(None))
+        .group_by(model.event_id, bucket)
+    )
+
+def aggregate_activity_rollups(db: Session):
+    """Yield every rollup row recounted from the base tables"""
+    for metric in ROLLUP_METRICS:
+        for granularity in ROLLUP_GRANULARITIES:
+            for event_id, college_id, bucket_start, count in count_activity_rollup(db, metric, granularity):
+                yield {
+                    "metric": metric,
+                    "granularity": granularity,
+                    "event_id": event_id,
+                    "bucket_start": datetime.fromisoformat(bucket_start),
+                    "college_id": college_id,
+                    "count": count,
+                }
+
+def rebuild_activity_rollups(db: Session, verify_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    Recompute the registration and attendance rollups from the base tables and
+    report drift. Unless ``verify_only`` is set, the rollups are rewritten.
+    """
+    stored = {
+        (rollup.metric, rollup.granularity, rollup.event_id, rollup.bucket_start): rollup.count
+        for rollup in db.query(ActivityRollup).all()
+    }
+    actual = {
+        (row["metric"], row["granularity"], row["event_id"], row["bucket_start"]): row
+        for row in aggregate_activity_rollups(db)
+    }
+    drift = []
+    for rollup_key in sorted(set(stored) | set(actual)):
+        recorded = stored.get(rollup_key)
+        recount = actual[rollup_key]["count"] if rollup_key in actual else None
+        if recorded != recount:
+            metric, granularity, event_id, bucket_start = rollup_key
+            drift.append({
+                "rollup": f"{metric}/{granularity} event={event_id} {bucket_start:%Y-%m-%d %H:%M}",
+                "counter": "count",
+                "stored": recorded,
+                "actual": recount,
+            })
+    if not verify_only and drift:
+        db.query(ActivityRollup).delete()
+        rows = list(actual.values())
+        for i in range(0, len(rows), 5000):
+            db.execute(insert(ActivityRollup), rows[i:i + 5000])
+    if not verify_only:
+        db.commit()
+    return drift
+
+def event_report_from_stats(event_id: int, title: str, stats: EventStats) -> EventReport:
+    """Build an EventReport from a maintained event_stats row"""
+    attendance_percentage = (
+        stats.attendance_count / stats.registration_count * 100
+    ) if stats.registration_count > 0 else 0
+    avg_feedback = stats.rating_sum / stats.feedback_count if stats.feedback_count > 0 else None
+    return EventReport(
+        event_id=event_id,
+        event_title=title,
+        total_registrations=stats.registration_count,
+        total_attendance=stats.attendance_count,
+        attendance_percentage=round(attendance_percentage, 2),
+        average_feedback=round(avg_feedback, 2) if avg_feedback else None,
+        total_feedback_count=stats.feedback_count
+    )
+
+def build_event_reports(db: Session, *criteria) -> List[EventReport]:
+    """Read reports for all events matching the given filters from event_stats"""
+    rows = (
+        db.query(Event.id, Event.title, EventStats)
+        .outerjoin(EventStats, EventStats.event_id == Event.id)
+        .filter(*criteria)
+        .order_by(Event.id)
+        .all()
+    )
+    missing = [event_id for event_id, _, stats in rows if stats is None]
+    if missing:
+        # Events written outside the API (e.g. by sample_data.py) have no stats yet
+        ensure_event_stats(db, Event.id.in_(missing))
+        db.commit()
+        return build_event_reports(db, *criteria)
+    return [event_report_from_stats(event_id, title, stats) for event_id, title, stats in rows]
+
+def build_student_reports(db: Session, *criteria, limit: Optional[int] = None,
+                          after: Optional[int] = None) -> List[StudentReport]:
+    """
+    Build reports for the students matching the given filters in one query.
+    The matching student ids (one keyset page of them when ``limit`` is set)
+    are selected first, and attendance and feedback are aggregated only for
+    those students before being joined with the college name.
+    """
+    page = db.query(Student.id).filter(*criteria)
+    if after is not None:
+        page = page.filter(Student.id > after)
+    page = page.order_by(Student.id)
+    if limit is not None:
+        page = page.limit(limit)
+    page = page.cte("page")
+    
+    attendance = (
+        db.query(Attendance.student_id, func.count(Attendance.id).label("total"))
+        .filter(Attendance.student_id.in_(select(page.c.id)))
+        .group_by(Attendance.student_id)
+        .subquery()
+    )
+    feedback = (
+        db.query(Feedback.student_id, func.avg(Feedback.rating).label("average"))
+        .filter(Feedback.student_id.in_(select(page.c.id)))
+        .group_by(Feedback.student_id)
+        .subquery()
+    )
+    
+    rows = (
+        db.query(
+            Student.id,
+            Student.name,
+            College.name.label("college_name"),
+            func.coalesce(attendance.c.total, 0).label("total_events_attended"),
+            feedback.c.average,
+        )
+        .join(page, page.c.id == Student.id)
+        .join(College, College.id == Student.college_id)
+        .outerjoin(attendance, attendance.c.student_id == Student.id)
+        .outerjoin(feedback, feedback.c.student_id == Student.id)
+        .order_by(Student.id)
+        .all()
+    )
+    return [
+        StudentReport(
+            student_id=row.id,
+            student_name=row.name,
+            college_name=row.college_name,
+            total_events_attended=row.total_events_attended,
+            average_feedback_given=round(row.average, 2) if row.average else None
+        )
+        for row in rows
+    ]
+
+def paginate_student_reports(db: Session, response: Response, limit: int, after: Optional[int], *criteria):
+    """One keyset page of student reports, with X-Next-After set like ``paginate``"""
+    reports = build_student_reports(db, *criteria, limit=limit + 1, after=after)
+    if len(reports) > limit:
+        reports = reports[:limit]
+        response.headers["X-Next-After"] = str(reports[-1].student_id)
+    return reports
+
+# Backfill statistics for events and students created before the summary tables existed
+with SessionLocal() as _db:
+    ensure_event_stats(_db)
+    ensure_student_activity(_db)
+    if _db.query(ActivityRollup.event_id).first() is None:
+        rebuild_activity_rollups(_db)
+    _db.commit()
+
+def claim_event_seats(db: Session, event_id: int, seats: int = 1, *guards) -> bool:
+    """
+    Take ``seats`` seats of an event in a single guarded write.
+    The event's registration counter is only incremented while it stays within
+    capacity, the event is open and any extra ``guards`` hold, so concurrent
+    requests can never overbook. Duplicates are rejected by the unique index.
+    """
+    capacity = select(Event.max_capacity).where(
+        Event.id == event_id,
+        Event.is_cancelled.isnot(True),
+        Event.start_time > datetime.utcnow(),
+    ).scalar_subquery()
+    updated = db.query(EventStats).filter(
+        EventStats.event_id == event_id,
+        EventStats.registration_count + seats <= capacity,
+        *guards
+    ).update(
+        {
+            EventStats.registration_count: EventStats.registration_count + seats,
+            EventStats.updated_at: datetime.utcnow(),
+        },
+        synchronize_session=False,
+    )
+    return updated == 1
+
+def check_registration_allowed(db: Session, student_id: int, event_id: int):
+    """Raise the HTTP error for the first registration rule the request violates"""
+    # Check if student exists
+    student = db.query(Student).filter(Student.id == student_id).first()
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    
+    # Check if event exists
+    event = db.query(Event).filter(Event.id == event_id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    # Check if event is cancelled
+    if event.is_cancelled:
+        raise HTTPException(status_code=400, detail="Cannot register for cancelled event")
+    
+    # Check if registration is still open
+    if not is_registration_open(event):
+        raise HTTPException(status_code=400, detail="Registration closed - event has started")
+    
+    # Check for duplicate registration
+    existing_registration = db.query(Registration).filter(
+        Registration.student_id == student_id,
+        Registration.event_id == event_id
+    ).first()
+    if existing_registration:
+        raise HTTPException(status_code=400, detail="Already registered for this event")
+    
+    # Check capacity
+    stats = db.query(EventStats).filter(EventStats.event_id == event_id).first()
+    if stats and stats.registration_count >= event.max_capacity:
+        raise HTTPException(status_code=400, detail="Event is at full capacity")
+
+# Conditional requests
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match header already names ``etag``"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
+TABLE_VERSIONS_QUERY = "SELECT table_name, version FROM table_versions"
+
+def read_table_versions(bind, tables) -> tuple:
+    """
+    Return the stored write versions of ``tables``, read through engine ``bind``.
+    SQLite triggers move them on every insert, update and delete, whichever
+    process or connection writes.
+    Read on a raw pooled connection: a 304 answer needs nothing else from the
+    database, and a session would cost several times the query itself.
+    """
+    connection = bind.raw_connection()
+    try:
+        started = time.perf_counter()
+        rows = connection.driver_connection.execute(TABLE_VERSIONS_QUERY).fetchall()
+        record_statement(metrics, TABLE_VERSIONS_QUERY, time.perf_counter() - started)
+    finally:
+        connection.close()
+    wanted = set(tables)
+    return tuple(sorted(row for row in rows if row[0] in wanted))
+
+def report_etag(db: Session, kind: str, key: Any, *tables: str) -> str:
+    """
+    Build a report validator from the stored write versions of the tables it reads.
+    They are read (a few primary-key lookups) before the report is built, so a
+    write racing the aggregation can only cause an extra refetch.
+    """
+    versions = read_table_versions(db.get_bind(), tables)
+    digest = hashlib.sha1(f"{kind}:{key}:{versions}".encode()).hexdigest()
+    return f'"report-{digest[:16]}"'
+
+def require_row(db: Session, model, key: int, detail: str):
+    """
+    Raise a 404 unless ``model`` has a row with id ``key``. Reports check this
+    before their ETag, so ``If-None-Match: *`` cannot answer 304 for a missing row.
+    """
+    if not db.scalar(select(exists().where(model.id == key))):
+        raise HTTPException(status_code=404, detail=detail)
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client holds ``etag``, else tag ``response`` with it"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+# Pagination
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def paginate(query, id_column, response: Response, limit: int, after: Optional[int]):
+    """
+    Return one keyset page of ``query`` ordered by ``id_column``.
+    When more rows remain, the last id is sent in the X-Next-After header
+    so the client can pass it back as ``after`` to fetch the next page.
+    """
+    if after is not None:
+        query = query.filter(id_column > after)
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-After"] = str(rows[-1].id)
+    return rows
+
 # API Endpoints
 
 @app.get("/")
 async def root():
     return {"message": "Campus Event Reporting System API"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Request counts, latency histograms, in-flight requests and SQL statements
+    per route in Prometheus text format
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # College endpoints
 @app.post("/colleges/", response_model=CollegeResponse)
-async def create_college(college: CollegeCreate, db: Session = Depends(get_db)):
+def create_college(college: CollegeCreate, db: Session = Depends(get_db)):
     db_college = College(**college.dict())
     db.add(db_college)
     db.commit()
@@ -237,12 +1004,17 @@ async def create_college(college: CollegeCreate, db: Session = Depends(get_db)):
     return db_college
 
 @app.get("/colleges/", response_model=List[CollegeResponse])
-async def get_colleges(db: Session = Depends(get_db)):
-    return db.query(College).all()
+def get_colleges(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    return paginate(db.query(College), College.id, response, limit, after)
 
 # Student endpoints
 @app.post("/students/", response_model=StudentResponse)
-async def create_student(student: StudentCreate, db: Session = Depends(get_db)):
+def create_student(student: StudentCreate, db: Session = Depends(get_db)):
     # Check if college exists
     college = db.query(College).filter(College.id == student.college_id).first()
     if not college:
@@ -255,16 +1027,27 @@ async def create_student(student: StudentCreate, db: Session = Depends(get_db)):
     
     db_student = Student(**student.dict())
     db.add(db_student)
+    db.flush()
+    db.add(StudentActivity(student_id=db_student.id, college_id=db_student.college_id))
     db.commit()
     db.refresh(db_student)
     return db_student
 
 @app.get("/students/", response_model=List[StudentResponse])
-async def get_students(db: Session = Depends(get_db)):
-    return db.query(Student).all()
+def get_students(
+    response: Response,
+    college_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    query = db.query(Student)
+    if college_id is not None:
+        query = query.filter(Student.college_id == college_id)
+    return paginate(query, Student.id, response, limit, after)
 
 @app.get("/students/{student_id}", response_model=StudentResponse)
-async def get_student(student_id: int, db: Session = Depends(get_db)):
+def get_student(student_id: int, db: Session = Depends(get_db)):
     student = db.query(Student).filter(Student.id == student_id).first()
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
@@ -272,7 +1055,7 @@ async def get_student(student_id: int, db: Session = Depends(get_db)):
 
 # Event endpoints (Admin only)
 @app.post("/events/", response_model=EventResponse)
-async def create_event(event: EventCreate, db: Session = Depends(get_db)):
+def create_event(event: EventCreate, db: Session = Depends(get_db)):
     # Check if college exists
     college = db.query(College).filter(College.id == event.college_id).first()
     if not college:
@@ -284,23 +1067,43 @@ async def create_event(event: EventCreate, db: Session = Depends(get_db)):
     
     db_event = Event(**event.dict())
     db.add(db_event)
+    db.flush()
+    db.add(EventStats(event_id=db_event.id))
     db.commit()
     db.refresh(db_event)
     return db_event
 
 @app.get("/events/", response_model=List[EventResponse])
-async def get_events(db: Session = Depends(get_db)):
-    return db.query(Event).all()
+def get_events(
+    response: Response,
+    college_id: Optional[int] = None,
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
+    is_cancelled: Optional[bool] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    query = db.query(Event)
+    if college_id is not None:
+        query = query.filter(Event.college_id == college_id)
+    if starts_after is not None:
+        query = query.filter(Event.start_time >= starts_after)
+    if starts_before is not None:
+        query = query.filter(Event.start_time < starts_before)
+    if is_cancelled is not None:
+        query = query.filter(Event.is_cancelled == is_cancelled)
+    return paginate(query, Event.id, response, limit, after)
 
 @app.get("/events/{event_id}", response_model=EventResponse)
-async def get_event(event_id: int, db: Session = Depends(get_db)):
+def get_event(event_id: int, db: Session = Depends(get_db)):
     event = db.query(Event).filter(Event.id == event_id).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     return event
 
 @app.put("/events/{event_id}/cancel")
-async def cancel_event(event_id: int, db: Session = Depends(get_db)):
+def cancel_event(event_id: int, db: Session = Depends(get_db)):
     event = db.query(Event).filter(Event.id == event_id).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -311,53 +1114,143 @@ async def cancel_event(event_id: int, db: Session = Depends(get_db)):
 
 # Registration endpoints
 @app.post("/registrations/")
-async def register_for_event(registration: RegistrationCreate, db: Session = Depends(get_db)):
-    # Check if student exists
-    student = db.query(Student).filter(Student.id == registration.student_id).first()
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
+def register_for_event(registration: RegistrationCreate, db: Session = Depends(get_db)):
+    try:
+        for attempt in range(2):
+            student_exists = exists().where(Student.id == registration.student_id)
+            if claim_event_seats(db, registration.event_id, 1, student_exists):
+                registered_at = datetime.utcnow()
+                db.add(Registration(**registration.dict(), registered_at=registered_at))
+                bump_activity_rollups(db, "registrations", [(registration.event_id, registered_at)])
+                db.commit()
+                return {"message": "Successfully registered for event"}
+            db.rollback()
+            
+            # The guarded write matched nothing: report which rule was violated
+            check_registration_allowed(db, registration.student_id, registration.event_id)
+            
+            # No rule was violated, so the event has no statistics row yet
+            ensure_event_stats(db, Event.id == registration.event_id)
+            db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Already registered for this event")
+    except OperationalError:
+        db.rollback()
+        raise HTTPException(status_code=503, detail="Database is busy - please retry")
     
-    # Check if event exists
-    event = db.query(Event).filter(Event.id == registration.event_id).first()
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
+    raise HTTPException(status_code=503, detail="Registration could not be completed - please retry")
+
+@app.post("/registrations/batch", response_model=RegistrationBatchResponse)
+def register_for_event_batch(batch: RegistrationBatch, db: Session = Depends(get_db)):
+    """
+    Register many students at once, e.g. a whole class for a workshop.
+    Existence, duplicates and remaining capacity are checked with a few
+    set-based queries; seats are handed out in request order and all
+    accepted registrations are committed together.
+    """
+    if batch.student_ids and batch.event_id is None:
+        raise HTTPException(status_code=400, detail="event_id is required with student_ids")
+    pairs = [(student_id, batch.event_id) for student_id in batch.student_ids]
+    pairs += [(registration.student_id, registration.event_id) for registration in batch.registrations]
+    if not pairs:
+        raise HTTPException(status_code=400, detail="No registrations given")
     
-    # Check if event is cancelled
-    if event.is_cancelled:
-        raise HTTPException(status_code=400, detail="Cannot register for cancelled event")
+    student_ids = {student_id for student_id, _ in pairs}
+    event_ids = {event_id for _, event_id in pairs}
     
-    # Check if registration is still open
-    if not is_registration_open(event):
-        raise HTTPException(status_code=400, detail="Registration closed - event has started")
+    ensure_event_stats(db, Event.id.in_(event_ids))
+    students = {
+        student_id for (student_id,) in
+        db.query(Student.id).filter(Student.id.in_(student_ids)).all()
+    }
+    events = {
+        event.id: (event, stats) for event, stats in
+        db.query(Event, EventStats).join(EventStats, EventStats.event_id == Event.id)
+        .filter(Event.id.in_(event_ids)).all()
+    }
+    registered = set(
+        db.query(Registration.student_id, Registration.event_id).filter(
+            Registration.student_id.in_(student_ids),
+            Registration.event_id.in_(event_ids)
+        ).all()
+    )
+    remaining = {
+        event_id: event.max_capacity - stats.registration_count
+        for event_id, (event, stats) in events.items()
+    }
     
-    # Check for duplicate registration
-    existing_registration = db.query(Registration).filter(
-        Registration.student_id == registration.student_id,
-        Registration.event_id == registration.event_id
-    ).first()
-    if existing_registration:
-        raise HTTPException(status_code=400, detail="Already registered for this event")
+    accepted = []
+    rejected = []
+    for student_id, event_id in pairs:
+        event = events.get(event_id, (None, None))[0]
+        if student_id not in students:
+            reason, detail = "student_not_found", "Student not found"
+        elif event is None:
+            reason, detail = "event_not_found", "Event not found"
+        elif event.is_cancelled:
+            reason, detail = "event_cancelled", "Cannot register for cancelled event"
+        elif not is_registration_open(event):
+            reason, detail = "registration_closed", "Registration closed - event has started"
+        elif (student_id, event_id) in registered:
+            reason, detail = "duplicate", "Already registered for this event"
+        elif remaining[event_id] <= 0:
+            reason, detail = "event_full", "Event is at full capacity"
+        else:
+            registered.add((student_id, event_id))
+            remaining[event_id] -= 1
+            accepted.append({"student_id": student_id, "event_id": event_id})
+            continue
+        rejected.append(RegistrationRejection(
+            student_id=student_id, event_id=event_id, reason=reason, detail=detail
+        ))
     
-    # Check capacity
-    current_registrations = db.query(Registration).filter(
-        Registration.event_id == registration.event_id
-    ).count()
-    if current_registrations >= event.max_capacity:
-        raise HTTPException(status_code=400, detail="Event is at full capacity")
+    if accepted:
+        try:
+            for event_id, seats in Counter(row["event_id"] for row in accepted).items():
+                if not claim_event_seats(db, event_id, seats):
+                    db.rollback()
+                    raise HTTPException(
+                        status_code=409,
+                        detail=f"Capacity of event {event_id} changed during the batch - please retry"
+                    )
+            registered_at = datetime.utcnow()
+            db.execute(insert(Registration), [
+                dict(row, registered_at=registered_at) for row in accepted
+            ])
+            bump_activity_rollups(db, "registrations", [(row["event_id"], registered_at) for row in accepted])
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail="Some students were registered concurrently - please retry"
+            )
+        except OperationalError:
+            db.rollback()
+            raise HTTPException(status_code=503, detail="Database is busy - please retry")
+    else:
+        db.commit()
     
-    db_registration = Registration(**registration.dict())
-    db.add(db_registration)
-    db.commit()
-    return {"message": "Successfully registered for event"}
+    return RegistrationBatchResponse(
+        registered=[RegistrationCreate(**row) for row in accepted],
+        rejected=rejected
+    )
 
 @app.get("/registrations/student/{student_id}")
-async def get_student_registrations(student_id: int, db: Session = Depends(get_db)):
-    registrations = db.query(Registration).filter(Registration.student_id == student_id).all()
-    return registrations
+def get_student_registrations(
+    student_id: int,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    query = db.query(Registration).filter(Registration.student_id == student_id)
+    return paginate(query, Registration.id, response, limit, after)
 
 # Attendance endpoints
 @app.post("/attendance/")
-async def check_in_attendance(attendance: AttendanceCreate, db: Session = Depends(get_db)):
+def check_in_attendance(attendance: AttendanceCreate, db: Session = Depends(get_db)):
     # Check if student exists
     student = db.query(Student).filter(Student.id == attendance.student_id).first()
     if not student:
@@ -392,14 +1285,120 @@ async def check_in_attendance(attendance: AttendanceCreate, db: Session = Depend
     if not is_event_active(event):
         raise HTTPException(status_code=400, detail="Cannot check in - event is not active")
     
-    db_attendance = Attendance(**attendance.dict())
+    checked_in_at = datetime.utcnow()
+    db_attendance = Attendance(**attendance.dict(), checked_in_at=checked_in_at)
     db.add(db_attendance)
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent request checked the same student in first
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Already checked in for this event")
+    bump_event_stats(db, attendance.event_id, attendance_count=1)
+    bump_student_activity(db, {attendance.student_id: 1})
+    bump_activity_rollups(db, "attendance", [(attendance.event_id, checked_in_at)])
     db.commit()
     return {"message": "Successfully checked in for event"}
 
+@app.post("/attendance/batch", response_model=AttendanceBatchResponse)
+def check_in_attendance_batch(batch: AttendanceBatch, db: Session = Depends(get_db)):
+    """
+    Check in many scanned badges at once.
+    Applies the same rules as POST /attendance/ with a handful of set-based
+    queries and inserts every valid record in one transaction. Each record
+    gets its own status: ok, student_not_found, event_not_found,
+    event_cancelled, not_registered, duplicate or event_inactive.
+    """
+    now = datetime.utcnow()
+    student_ids = {record.student_id for record in batch.records}
+    event_ids = {record.event_id for record in batch.records}
+    
+    students = {
+        student_id for (student_id,) in
+        db.query(Student.id).filter(Student.id.in_(student_ids)).all()
+    }
+    events = {event.id: event for event in db.query(Event).filter(Event.id.in_(event_ids)).all()}
+    registered = set(
+        db.query(Registration.student_id, Registration.event_id).filter(
+            Registration.student_id.in_(student_ids),
+            Registration.event_id.in_(event_ids)
+        ).all()
+    )
+    attended = set(
+        db.query(Attendance.student_id, Attendance.event_id).filter(
+            Attendance.student_id.in_(student_ids),
+            Attendance.event_id.in_(event_ids)
+        ).all()
+    )
+    
+    results = []
+    new_attendance = []
+    for record in batch.records:
+        pair = (record.student_id, record.event_id)
+        event = events.get(record.event_id)
+        checked_in_at = now
+        if record.scanned_at is not None:
+            scanned_at = record.scanned_at
+            if scanned_at.tzinfo is not None:
+                scanned_at = scanned_at.astimezone(timezone.utc).replace(tzinfo=None)
+            # Never trust a scanner clock that runs ahead of ours
+            checked_in_at = min(scanned_at, now)
+        
+        if record.student_id not in students:
+            status_name, detail = "student_not_found", "Student not found"
+        elif event is None:
+            status_name, detail = "event_not_found", "Event not found"
+        elif event.is_cancelled:
+            status_name, detail = "event_cancelled", "Cannot check in for cancelled event"
+        elif pair not in registered:
+            status_name, detail = "not_registered", "Student not registered for this event"
+        elif pair in attended:
+            status_name, detail = "duplicate", "Already checked in for this event"
+        elif not is_event_active(event, checked_in_at):
+            status_name, detail = "event_inactive", "Cannot check in - event is not active"
+        else:
+            status_name, detail = "ok", None
+            attended.add(pair)
+            new_attendance.append({
+                "student_id": record.student_id,
+                "event_id": record.event_id,
+                "checked_in_at": checked_in_at,
+            })
+        results.append(AttendanceScanResult(
+            student_id=record.student_id,
+            event_id=record.event_id,
+            status=status_name,
+            detail=detail
+        ))
+    
+    if new_attendance:
+        # Concurrent uploads of the same scans can pass the checks above together;
+        # the unique index decides, and only rows actually inserted are counted
+        statement = sqlite_insert(Attendance).on_conflict_do_nothing(
+            index_elements=["student_id", "event_id"]
+        ).returning(Attendance.student_id, Attendance.event_id)
+        inserted = {tuple(row) for row in db.execute(statement, new_attendance)}
+        if len(inserted) < len(new_attendance):
+            new_attendance = [row for row in new_attendance if (row["student_id"], row["event_id"]) in inserted]
+            for i, result in enumerate(results):
+                if result.status == "ok" and (result.student_id, result.event_id) not in inserted:
+                    results[i] = result.model_copy(update={
+                        "status": "duplicate", "detail": "Already checked in for this event"
+                    })
+    
+    if new_attendance:
+        per_event = Counter(row["event_id"] for row in new_attendance)
+        for event_id, count in per_event.items():
+            bump_event_stats(db, event_id, attendance_count=count)
+        bump_student_activity(db, Counter(row["student_id"] for row in new_attendance))
+        bump_activity_rollups(db, "attendance", [(row["event_id"], row["checked_in_at"]) for row in new_attendance])
+        db.commit()
+    
+    return AttendanceBatchResponse(checked_in=len(new_attendance), results=results)
+
 # Feedback endpoints
 @app.post("/feedback/")
-async def submit_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db)):
+def submit_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db)):
     # Check if student exists
     student = db.query(Student).filter(Student.id == feedback.student_id).first()
     if not student:
@@ -432,115 +1431,215 @@ async def submit_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db
     
     db_feedback = Feedback(**feedback.dict())
     db.add(db_feedback)
+    bump_event_stats(db, feedback.event_id, feedback_count=1, rating_sum=feedback.rating)
     db.commit()
     return {"message": "Feedback submitted successfully"}
 
 # Reporting endpoints
+# Reports run on the read-only pool, except the event reports: build_event_reports
+# backfills missing event_stats rows, which needs a writable session
 @app.get("/reports/events/{event_id}", response_model=EventReport)
-async def get_event_report(event_id: int, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
+def get_event_report(event_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    require_row(db, Event, event_id, "Event not found")
+    etag = report_etag(db, "event", event_id, "events", "event_stats")
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     
-    # Get registration count
-    total_registrations = db.query(Registration).filter(Registration.event_id == event_id).count()
-    
-    # Get attendance count
-    total_attendance = db.query(Attendance).filter(Attendance.event_id == event_id).count()
-    
-    # Calculate attendance percentage
-    attendance_percentage = (total_attendance / total_registrations * 100) if total_registrations > 0 else 0
-    
-    # Get average feedback
-    feedback_query = db.query(Feedback).filter(Feedback.event_id == event_id)
-    feedback_count = feedback_query.count()
-    avg_feedback = None
-    if feedback_count > 0:
-        avg_feedback = db.query(Feedback.rating).filter(Feedback.event_id == event_id).all()
-        avg_feedback = sum([f[0] for f in avg_feedback]) / feedback_count
+    reports = build_event_reports(db, Event.id == event_id)
+    if not reports:
+        raise HTTPException(status_code=404, detail="Event not found")
     
-    return EventReport(
-        event_id=event.id,
-        event_title=event.title,
-        total_registrations=total_registrations,
-        total_attendance=total_attendance,
-        attendance_percentage=round(attendance_percentage, 2),
-        average_feedback=round(avg_feedback, 2) if avg_feedback else None,
-        total_feedback_count=feedback_count
-    )
+    return reports[0]
 
 @app.get("/reports/students/{student_id}", response_model=StudentReport)
-async def get_student_report(student_id: int, db: Session = Depends(get_db)):
-    student = db.query(Student).filter(Student.id == student_id).first()
-    if not student:
+def get_student_report(student_id: int, request: Request, response: Response, db: Session = Depends(get_readonly_db)):
+    require_row(db, Student, student_id, "Student not found")
+    etag = report_etag(db, "student", student_id, "students", "colleges", "attendance", "feedback")
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    reports = build_student_reports(db, Student.id == student_id)
+    if not reports:
         raise HTTPException(status_code=404, detail="Student not found")
+    return reports[0]
+
+@app.get("/reports/students", response_model=List[StudentReport])
+def get_student_reports(
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description="Comma-separated student ids"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    db: Session = Depends(get_readonly_db)
+):
+    """
+    Get reports for many students at once (unknown ids are skipped)
+    """
+    try:
+        student_ids = sorted({int(value) for value in ids.split(",") if value.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if len(student_ids) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} ids per request")
     
-    # Get total events attended
-    total_events_attended = db.query(Attendance).filter(Attendance.student_id == student_id).count()
+    etag = report_etag(
+        db, "students", (student_ids, limit, after), "students", "colleges", "attendance", "feedback"
+    )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     
-    # Get average feedback given
-    feedback_query = db.query(Feedback).filter(Feedback.student_id == student_id)
-    feedback_count = feedback_query.count()
-    avg_feedback = None
-    if feedback_count > 0:
-        avg_feedback = db.query(Feedback.rating).filter(Feedback.student_id == student_id).all()
-        avg_feedback = sum([f[0] for f in avg_feedback]) / feedback_count
+    return paginate_student_reports(db, response, limit, after, Student.id.in_(student_ids))
+
+@app.get("/reports/colleges/{college_id}/events")
+def get_college_events_report(college_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    require_row(db, College, college_id, "College not found")
+    etag = report_etag(db, "college-events", college_id, "colleges", "events", "event_stats")
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     
-    return StudentReport(
-        student_id=student.id,
-        student_name=student.name,
-        college_name=student.college.name,
-        total_events_attended=total_events_attended,
-        average_feedback_given=round(avg_feedback, 2) if avg_feedback else None
+    return build_event_reports(db, Event.college_id == college_id)
+
+@app.get("/reports/colleges/{college_id}/students", response_model=List[StudentReport])
+def get_college_students_report(
+    college_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    db: Session = Depends(get_readonly_db)
+):
+    """
+    Get reports for every student of a college, one keyset page at a time
+    """
+    require_row(db, College, college_id, "College not found")
+    etag = report_etag(
+        db, "college-students", (college_id, limit, after), "students", "colleges", "attendance", "feedback"
     )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    return paginate_student_reports(db, response, limit, after, Student.college_id == college_id)
 
-@app.get("/reports/colleges/{college_id}/events")
-async def get_college_events_report(college_id: int, db: Session = Depends(get_db)):
-    college = db.query(College).filter(College.id == college_id).first()
-    if not college:
-        raise HTTPException(status_code=404, detail="College not found")
+MAX_TIMESERIES_POINTS = 10000
+
+@app.get("/reports/timeseries", response_model=TimeseriesResponse)
+def get_activity_timeseries(
+    request: Request,
+    response: Response,
+    metric: Literal["registrations", "attendance"] = "registrations",
+    bucket: Literal["15m", "hour", "day"] = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    event_id: Optional[int] = None,
+    college_id: Optional[int] = None,
+    fill_gaps: bool = False,
+    db: Session = Depends(get_readonly_db)
+):
+    """
+    Get registrations or check-ins per time bucket from the maintained rollups
+    Scoped to one event, one college or the whole campus; ``start`` is
+    inclusive and ``end`` exclusive (UTC). With ``fill_gaps`` empty buckets
+    between the first and last point are returned with a count of 0.
+    """
+    start, end = [
+        value.astimezone(timezone.utc).replace(tzinfo=None) if value and value.tzinfo else value
+        for value in (start, end)
+    ]
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    etag = report_etag(
+        db, "timeseries", (metric, bucket, start, end, event_id, college_id, fill_gaps), "activity_rollups"
+    )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     
-    events = db.query(Event).filter(Event.college_id == college_id).all()
-    reports = []
+    query = db.query(ActivityRollup.bucket_start, func.sum(ActivityRollup.count)).filter(
+        ActivityRollup.metric == metric,
+        ActivityRollup.granularity == bucket
+    )
+    if event_id is not None:
+        query = query.filter(ActivityRollup.event_id == event_id)
+    if college_id is not None:
+        query = query.filter(ActivityRollup.college_id == college_id)
+    if start is not None:
+        query = query.filter(ActivityRollup.bucket_start >= rollup_bucket(start, bucket))
+    if end is not None:
+        query = query.filter(ActivityRollup.bucket_start < end)
+    rows = (
+        query.group_by(ActivityRollup.bucket_start)
+        .order_by(ActivityRollup.bucket_start)
+        .limit(MAX_TIMESERIES_POINTS + 1)
+        .all()
+    )
     
-    for event in events:
-        total_registrations = db.query(Registration).filter(Registration.event_id == event.id).count()
-        total_attendance = db.query(Attendance).filter(Attendance.event_id == event.id).count()
-        attendance_percentage = (total_attendance / total_registrations * 100) if total_registrations > 0 else 0
-        
-        feedback_query = db.query(Feedback).filter(Feedback.event_id == event.id)
-        feedback_count = feedback_query.count()
-        avg_feedback = None
-        if feedback_count > 0:
-            avg_feedback = db.query(Feedback.rating).filter(Feedback.event_id == event.id).all()
-            avg_feedback = sum([f[0] for f in avg_feedback]) / feedback_count
-        
-        reports.append(EventReport(
-            event_id=event.id,
-            event_title=event.title,
-            total_registrations=total_registrations,
-            total_attendance=total_attendance,
-            attendance_percentage=round(attendance_percentage, 2),
-            average_feedback=round(avg_feedback, 2) if avg_feedback else None,
-            total_feedback_count=feedback_count
-        ))
+    counts = dict(rows)
+    buckets = list(counts)
+    if fill_gaps and buckets:
+        step = ROLLUP_GRANULARITIES[bucket]
+        span = int((buckets[-1] - buckets[0]) / step) + 1
+        if span > MAX_TIMESERIES_POINTS:
+            raise HTTPException(status_code=400, detail="Range too large - use a coarser bucket")
+        buckets = [buckets[0] + step * i for i in range(span)]
+    if len(buckets) > MAX_TIMESERIES_POINTS:
+        raise HTTPException(status_code=400, detail="Range too large - use a coarser bucket")
     
-    return reports
+    return TimeseriesResponse(
+        metric=metric,
+        bucket=bucket,
+        event_id=event_id,
+        college_id=college_id,
+        points=[TimeseriesPoint(bucket_start=value, count=counts.get(value, 0)) for value in buckets]
+    )
 
-# SQL Query Endpoints
-@app.post("/execute-sql", response_model=SQLQueryResponse)
-async def execute_sql_endpoint(
-    request: SQLQueryRequest, 
-    db: Session = Depends(get_db)
+# Leaderboard endpoints
+@app.get("/leaderboard/students", response_model=List[LeaderboardEntry])
+def get_student_leaderboard(
+    request: Request,
+    response: Response,
+    college_id: Optional[int] = None,
+    n: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_readonly_db)
 ):
     """
-    Execute a SQL query and return results
-    Only SELECT queries are allowed for security
+    Get the N most active students campus-wide or for one college
+    Read from the maintained student_activity counts, never from attendance.
     """
-    start_time = time.time()
+    etag = report_etag(db, "leaderboard", (college_id, n), "students", "student_activity")
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     
-    # Basic security checks
-    query_lower = request.query.lower().strip()
+    query = (
+        db.query(StudentActivity.student_id, Student.name, StudentActivity.college_id, StudentActivity.attended_count)
+        .join(Student, Student.id == StudentActivity.student_id)
+        .filter(StudentActivity.attended_count > 0)
+    )
+    if college_id is not None:
+        query = query.filter(StudentActivity.college_id == college_id)
+    rows = query.order_by(StudentActivity.attended_count.desc(), StudentActivity.student_id).limit(n).all()
+    
+    return [
+        LeaderboardEntry(
+            rank=rank,
+            student_id=row.student_id,
+            student_name=row.name,
+            college_id=row.college_id,
+            attended_count=row.attended_count
+        )
+        for rank, row in enumerate(rows, start=1)
+    ]
+
+# SQL Query Endpoints
+def validate_select_query(query: str):
+    """Reject anything but a plain SELECT (basic security checks)"""
+    query_lower = query.lower().strip()
     
     # Block dangerous operations
     dangerous_keywords = [
@@ -561,75 +1660,369 @@ async def execute_sql_endpoint(
             status_code=400,
             detail="Only SELECT queries are allowed for security reasons"
         )
+
+SQL_QUERY_TIMEOUT = float(os.getenv("SQL_QUERY_TIMEOUT", "30"))
+SQL_MAX_ROWS = int(os.getenv("SQL_MAX_ROWS", "10000"))
+STREAM_BATCH_SIZE = 500
+# SQLite calls the progress handler every this many virtual machine instructions
+PROGRESS_HANDLER_STEPS = 10000
+
+class RunningQuery:
+    """An ad-hoc query in flight, with its time budget and cancellation flag"""
+    
+    def __init__(self, query_id: str, connection, timeout: float):
+        self.query_id = query_id
+        self.connection = connection
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + timeout
+        self.timeout = timeout
+        self.cancelled = threading.Event()
+        self._suspended_at = None
+    
+    def suspend(self):
+        """Stop the budget clock, e.g. while streamed rows wait for a slow client"""
+        self._suspended_at = time.monotonic()
     
+    def resume(self):
+        """Restart the budget clock, moving the deadline by the time spent suspended"""
+        if self._suspended_at is not None:
+            self.deadline += time.monotonic() - self._suspended_at
+            self._suspended_at = None
+    
+    def should_abort(self) -> int:
+        """Progress handler: a non-zero return makes SQLite interrupt the query"""
+        return int(self.cancelled.is_set() or time.monotonic() > self.deadline)
+    
+    def cancel(self):
+        self.cancelled.set()
+        self.connection.interrupt()
+    
+    def abort_error(self, error: Exception) -> HTTPException:
+        """Translate a SQLite error raised while running into an HTTP error"""
+        if self.cancelled.is_set():
+            return HTTPException(status_code=409, detail=f"Query {self.query_id} was cancelled")
+        if time.monotonic() > self.deadline:
+            return HTTPException(
+                status_code=408,
+                detail=f"Query exceeded its time budget of {self.timeout:g}s"
+            )
+        return HTTPException(status_code=400, detail=f"SQL execution error: {str(error)}")
+
+running_queries: Dict[str, RunningQuery] = {}
+_running_queries_lock = threading.Lock()
+
+def start_query(query_id: Optional[str], timeout_seconds: Optional[float]):
+    """
+    Check out a read-only connection and register the query as running.
+    The progress handler enforces the time budget and lets cancel requests stop it.
+    """
+    query_id = query_id or uuid.uuid4().hex
+    timeout = min(timeout_seconds or SQL_QUERY_TIMEOUT, SQL_QUERY_TIMEOUT)
+    connection = readonly_engine.raw_connection()
+    running = RunningQuery(query_id, connection.driver_connection, timeout)
+    with _running_queries_lock:
+        if query_id in running_queries:
+            connection.close()
+            raise HTTPException(status_code=409, detail=f"Query {query_id} is already running")
+        running_queries[query_id] = running
+    running.connection.set_progress_handler(running.should_abort, PROGRESS_HANDLER_STEPS)
+    return connection, running
+
+def finish_query(connection, running: RunningQuery):
+    """Unregister the query and return its connection to the pool"""
+    with _running_queries_lock:
+        running_queries.pop(running.query_id, None)
+    running.connection.set_progress_handler(None, 0)
+    connection.close()
+
+def stream_sql_query(request: SQLQueryRequest, start_time: float) -> StreamingResponse:
+    """
+    Run a query on a raw DBAPI cursor and stream its rows as they are fetched.
+    NDJSON output is a header frame with the columns, one array per row and a
+    trailer frame with the row count and timing. CSV output is a header row,
+    the data rows and a trailing ``#`` comment line with the same summary.
+    Only one batch of rows is held in memory at a time.
+    
+    Limits: cancellation applies at any point. The time budget applies, but
+    only to the time SQLite spends producing rows, not to the time the client
+    takes to read them; an abort after the headers went out is reported in
+    the trailer. ``max_rows`` and ``SQL_MAX_ROWS`` do not apply: every row of
+    the result is streamed.
+    """
+    stream_format = request.stream_format
+    connection, running = start_query(request.query_id, request.timeout_seconds)
+    try:
+        cursor = connection.cursor()
+        started = time.perf_counter()
+        cursor.execute(request.query)
+        record_statement(metrics, request.query, time.perf_counter() - started)
+    except Exception as e:
+        finish_query(connection, running)
+        raise running.abort_error(e)
+    # The budget only runs while SQLite works on the query, not while the
+    # client reads (or has not started reading) the rows already sent
+    running.suspend()
+    columns = [column[0] for column in cursor.description or []]
+    released = threading.Event()
+    
+    def release():
+        """Close the cursor and give back the connection, once"""
+        if not released.is_set():
+            released.set()
+            cursor.close()
+            finish_query(connection, running)
+    
+    def encode_ndjson(frame) -> str:
+        return json.dumps(frame, default=str) + "\n"
+    
+    def encode_csv(rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+    
+    def generate():
+        row_count = 0
+        try:
+            if stream_format == "ndjson":
+                yield encode_ndjson({"columns": columns, "query_id": running.query_id})
+            else:
+                yield encode_csv([columns])
+            while True:
+                running.resume()
+                try:
+                    rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+                except Exception as e:
+                    # Headers are already sent: report the abort in the trailer instead
+                    error = running.abort_error(e).detail
+                    if stream_format == "ndjson":
+                        yield encode_ndjson({"row_count": row_count, "error": error})
+                    else:
+                        yield f"# row_count={row_count} error={error}\n"
+                    return
+                running.suspend()
+                if not rows:
+                    break
+                row_count += len(rows)
+                if stream_format == "ndjson":
+                    yield "".join(encode_ndjson(list(row)) for row in rows)
+                else:
+                    yield encode_csv(rows)
+            execution_time = round(time.time() - start_time, 4)
+            if stream_format == "ndjson":
+                yield encode_ndjson({"row_count": row_count, "execution_time": execution_time})
+            else:
+                yield f"# row_count={row_count} execution_time={execution_time}\n"
+        finally:
+            release()
+    
+    stream = generate()
+    
+    def close_stream():
+        # Runs after the response, also when the client disconnected mid-body and
+        # left the generator suspended (or never started)
+        stream.close()
+        release()
+    
+    media_type = "application/x-ndjson" if stream_format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        stream, media_type=media_type, headers={"X-Query-Id": running.query_id},
+        background=BackgroundTask(close_stream),
+    )
+
+@app.post("/execute-sql", response_model=SQLQueryResponse)
+def execute_sql_endpoint(request: SQLQueryRequest):
+    """
+    Execute a SQL query and return results
+    Only SELECT queries are allowed for security. Queries are interrupted once
+    they exceed their time budget or are cancelled, and at most ``max_rows``
+    rows are returned (``truncated`` tells whether more were available).
+    """
+    start_time = time.time()
+    
+    validate_select_query(request.query)
+    
+    if request.stream_format:
+        return stream_sql_query(request, start_time)
+    
+    max_rows = min(request.max_rows or SQL_MAX_ROWS, SQL_MAX_ROWS)
+    
+    # Serve repeated dashboard queries from the cache while their tables are unchanged
+    cache_key = (normalize_query(request.query), max_rows)
+    # A query naming no model table (e.g. one on sqlite_master) depends on all of them
+    tables = referenced_tables(cache_key[0], Base.metadata.tables) or Base.metadata.tables
+    versions = read_table_versions(readonly_engine, tables)
+    cached = sql_result_cache.get(cache_key, versions)
+    if cached is not None:
+        return cached.model_copy(update={
+            "cached": True,
+            "query_id": request.query_id,
+            "execution_time": round(time.time() - start_time, 4)
+        })
+    
+    connection, running = start_query(request.query_id, request.timeout_seconds)
     try:
         # Execute the query
-        result = db.execute(text(request.query))
+        cursor = connection.cursor()
+        started = time.perf_counter()
+        cursor.execute(request.query)
         
-        # Convert to list of rows
-        rows = result.fetchall()
+        # Fetch one row past the cap to know whether the result was truncated
+        rows = cursor.fetchmany(max_rows + 1)
+        # Raw cursors bypass the engine hooks, so the statement is recorded here
+        record_statement(metrics, request.query, time.perf_counter() - started)
+        truncated = len(rows) > max_rows
+        rows = rows[:max_rows]
         
         # Get column names
-        columns = list(result.keys()) if rows else []
+        columns = [column[0] for column in cursor.description] if rows else []
+        cursor.close()
         
         # Convert rows to list of lists
         row_data = [list(row) for row in rows]
         
         execution_time = time.time() - start_time
         
-        return SQLQueryResponse(
+        response = SQLQueryResponse(
             columns=columns,
             rows=row_data,
             row_count=len(row_data),
-            execution_time=round(execution_time, 4)
+            execution_time=round(execution_time, 4),
+            truncated=truncated,
+            query_id=running.query_id
         )
+        sql_result_cache.put(cache_key, versions, response, len(row_data))
+        return response
         
     except Exception as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"SQL execution error: {str(e)}"
-        )
+        raise running.abort_error(e)
+    finally:
+        finish_query(connection, running)
 
-@app.get("/sql/schema")
-async def get_database_schema(db: Session = Depends(get_db)):
+@app.post("/sql/queries/{query_id}/cancel")
+async def cancel_sql_query(query_id: str):
     """
-    Get database schema information
+    Cancel a running /execute-sql query by the query_id it was started with
     """
+    with _running_queries_lock:
+        running = running_queries.get(query_id)
+    if running is None:
+        raise HTTPException(status_code=404, detail="No running query with this id")
+    running.cancel()
+    return {"message": "Query cancellation requested", "query_id": query_id}
+
+@app.post("/sql/explain", response_model=SQLExplainResponse)
+def explain_sql_query(request: SQLExplainRequest, db: Session = Depends(get_readonly_db)):
+    """
+    Show the SQLite query plan of a SELECT without running it
+    Full scans of registrations, attendance and feedback are flagged together
+    with covering indexes that would avoid them.
+    """
+    validate_select_query(request.query)
+    
     try:
-        # Get table names
-        tables_query = """
-        SELECT name FROM sqlite_master 
-        WHERE type='table' AND name NOT LIKE 'sqlite_%'
-        ORDER BY name;
-        """
-        tables_result = db.execute(text(tables_query))
-        tables = [row[0] for row in tables_result.fetchall()]
+        rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {request.query}").fetchall()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"SQL execution error: {str(e)}")
+    
+    table_columns = {
+        name: [column.name for column in table.columns]
+        for name, table in Base.metadata.tables.items()
+    }
+    return advise(request.query, rows, table_columns)
+
+@app.get("/sql/cache/stats")
+async def get_sql_cache_stats():
+    """
+    Get hit/miss/eviction statistics of the /execute-sql result cache
+    """
+    return sql_result_cache.stats()
+
+# Schema metadata only changes when PRAGMA schema_version does, so it is
+# introspected once per version and shared by all requests
+_schema_cache = {"version": None, "etag": None, "schema": None}
+_schema_cache_lock = threading.Lock()
+
+def introspect_schema(db: Session) -> Dict[str, Any]:
+    """Read tables, columns, indexes and foreign keys from the SQLite catalog"""
+    # Get table names
+    tables_query = """
+    SELECT name FROM sqlite_master 
+    WHERE type='table' AND name NOT LIKE 'sqlite_%'
+    ORDER BY name;
+    """
+    tables_result = db.execute(text(tables_query))
+    tables = [row[0] for row in tables_result.fetchall()]
+    
+    schema_info = {}
+    
+    for table in tables:
+        # Get column information
+        columns_query = f"PRAGMA table_info({table});"
+        columns_result = db.execute(text(columns_query))
+        columns = [
+            {
+                "name": row[1],
+                "type": row[2],
+                "not_null": bool(row[3]),
+                "default": row[4],
+                "primary_key": bool(row[5])
+            }
+            for row in columns_result.fetchall()
+        ]
         
-        schema_info = {}
+        # Get index information
+        indexes = []
+        for row in db.execute(text(f"PRAGMA index_list({table});")).fetchall():
+            index_columns = db.execute(text(f"PRAGMA index_info('{row[1]}');")).fetchall()
+            indexes.append({
+                "name": row[1],
+                "unique": bool(row[2]),
+                "origin": row[3],
+                "columns": [column[2] for column in sorted(index_columns)]
+            })
         
-        for table in tables:
-            # Get column information
-            columns_query = f"PRAGMA table_info({table});"
-            columns_result = db.execute(text(columns_query))
-            columns = [
-                {
-                    "name": row[1],
-                    "type": row[2],
-                    "not_null": bool(row[3]),
-                    "primary_key": bool(row[5])
-                }
-                for row in columns_result.fetchall()
-            ]
-            
-            schema_info[table] = {
-                "columns": columns,
-                "column_count": len(columns)
+        # Get foreign key information
+        foreign_keys = [
+            {
+                "column": row[3],
+                "references_table": row[2],
+                "references_column": row[4]
             }
+            for row in db.execute(text(f"PRAGMA foreign_key_list({table});")).fetchall()
+        ]
         
-        return {
-            "tables": tables,
-            "schema": schema_info
+        schema_info[table] = {
+            "columns": columns,
+            "column_count": len(columns),
+            "indexes": indexes,
+            "foreign_keys": foreign_keys
         }
+    
+    return {
+        "tables": tables,
+        "schema": schema_info
+    }
+
+@app.get("/sql/schema")
+def get_database_schema(request: Request, response: Response, db: Session = Depends(get_readonly_db)):
+    """
+    Get database schema information (tables, columns, indexes, foreign keys)
+    Served with an ETag so unchanged schemas cost clients a 304
+    """
+    try:
+        version = db.execute(text("PRAGMA schema_version;")).scalar()
+        with _schema_cache_lock:
+            if _schema_cache["version"] != version:
+                schema = introspect_schema(db)
+                digest = hashlib.sha1(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+                _schema_cache.update(version=version, etag=f'"schema-{digest[:16]}"', schema=schema)
+            etag, schema = _schema_cache["etag"], _schema_cache["schema"]
+        
+        cached = not_modified(request, response, etag)
+        if cached:
+            return cached
+        
+        return schema
         
     except Exception as e:
         raise HTTPException(
@@ -638,7 +2031,7 @@ async def get_database_schema(db: Session = Depends(get_db)):
         )
 
 @app.get("/sql/sample/{table_name}")
-async def get_sample_data(table_name: str, limit: int = 5, db: Session = Depends(get_db)):
+def get_sample_data(table_name: str, limit: int = 5, db: Session = Depends(get_readonly_db)):
     """
     Get sample data from a specific table
     """
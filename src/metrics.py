@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Per-endpoint metrics for Campus Event Reporting System
+An ASGI middleware records request counts by status code, latency histograms
+and in-flight requests per route template, and SQLAlchemy cursor hooks add the
+SQL statements and database time spent inside each request. Everything is kept
+in process memory and rendered in the Prometheus text exposition format.
+
+Recording is a few dictionary updates under one lock per request and per
+statement, so it can stay enabled in production.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# Seconds; the usual Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Statements per request: a jump to the higher buckets points at an N+1 query
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA", "EXPLAIN"}
+
+# Requests that no route matched share one label, so unknown URLs cannot grow the registry
+UNMATCHED_ROUTE = "<unmatched>"
+
+class Histogram:
+    """Bucket counts (not cumulative), sum and count of observed values"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class RouteMetrics:
+    __slots__ = ("statuses", "in_flight", "latency", "db_queries", "db_seconds")
+
+    def __init__(self):
+        self.statuses = Counter()
+        self.in_flight = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = 0.0
+
+class RequestStats:
+    """Statements and database time of the request running in this context"""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+# Worker threads run endpoints in a copy of the request's context, so they see
+# the same RequestStats object and their statements are added to it
+_current_request: ContextVar = ContextVar("metrics_request", default=None)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+def _number(value: float) -> str:
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """Thread-safe request and SQL statement metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._statements = Counter()
+        self._statement_seconds = Counter()
+
+    def _route(self, method: str, route: str) -> RouteMetrics:
+        key = (method, route)
+        metrics = self._routes.get(key)
+        if metrics is None:
+            metrics = self._routes[key] = RouteMetrics()
+        return metrics
+
+    def request_started(self, method: str, route: str):
+        with self._lock:
+            self._route(method, route).in_flight += 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            metrics = self._route(method, route)
+            metrics.in_flight -= 1
+            metrics.statuses[status] += 1
+            metrics.latency.observe(seconds)
+            metrics.db_queries.observe(stats.queries)
+            metrics.db_seconds += stats.db_seconds
+
+    def statement_finished(self, operation: str, seconds: float):
+        with self._lock:
+            self._statements[operation] += 1
+            self._statement_seconds[operation] += seconds
+
+    def statement_count(self) -> int:
+        """Total SQL statements recorded so far, by engine hooks and raw cursors alike"""
+        with self._lock:
+            return sum(self._statements.values())
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+
+            def header(name, kind, description):
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            def histogram(name, method, route, values):
+                cumulative = 0
+                for bound, count in zip(values.bounds, values.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(method=method, route=route, le=_number(float(bound)))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(method=method, route=route, le='+Inf')} {values.count}")
+                lines.append(f"{name}_sum{_labels(method=method, route=route)} {_number(values.sum)}")
+                lines.append(f"{name}_count{_labels(method=method, route=route)} {values.count}")
+
+            header("http_requests_total", "counter", "Requests handled, by route and status code")
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+            header("http_requests_in_flight", "gauge", "Requests currently being handled")
+            for (method, route), metrics in routes:
+                lines.append(f"http_requests_in_flight{_labels(method=method, route=route)} {metrics.in_flight}")
+
+            header("http_request_duration_seconds", "histogram", "Request latency until the response is sent")
+            for (method, route), metrics in routes:
+                if metrics.latency.count:
+                    histogram("http_request_duration_seconds", method, route, metrics.latency)
+
+            header("http_request_db_queries", "histogram", "SQL statements executed per request")
+            for (method, route), metrics in routes:
+                if metrics.db_queries.count:
+                    histogram("http_request_db_queries", method, route, metrics.db_queries)
+
+            header("http_request_db_seconds_total", "counter", "Time spent executing SQL statements, by route")
+            for (method, route), metrics in routes:
+                if metrics.latency.count:
+                    lines.append(f"http_request_db_seconds_total{_labels(method=method, route=route)} "
+                                 f"{_number(metrics.db_seconds)}")
+
+            header("db_statements_total", "counter", "SQL statements executed, by operation")
+            for operation, count in sorted(self._statements.items()):
+                lines.append(f"db_statements_total{_labels(operation=operation)} {count}")
+
+            header("db_statement_seconds_total", "counter", "Time spent executing SQL statements, by operation")
+            for operation, seconds in sorted(self._statement_seconds.items()):
+                lines.append(f"db_statement_seconds_total{_labels(operation=operation)} {_number(seconds)}")
+        return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request (including streamed bodies).
+    Requests are labelled with the path template of the route that will handle
+    them, e.g. ``/reports/events/{event_id}``, so ids do not create new series.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry, router):
+        self.app = app
+        self.registry = registry
+        self.router = router
+
+    def route_for(self, scope) -> str:
+        """
+        The path template of the route that will handle ``scope``. Only the path
+        pattern and method are checked, which is much cheaper than ``Route.matches``.
+        """
+        path, method = scope["path"], scope["method"]
+        for route in self.router.routes:
+            methods = getattr(route, "methods", None)
+            if route.path_regex.match(path) and (methods is None or method in methods):
+                return route.path
+        return UNMATCHED_ROUTE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        # Known before the request runs, so the in-flight gauge is per route too
+        route = self.route_for(scope)
+        self.registry.request_started(method, route)
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_request.reset(token)
+            self.registry.request_finished(method, route, status, time.perf_counter() - started, stats)
+
+def instrument_engine(engine, registry: MetricsRegistry):
+    """Count and time every statement ``engine`` executes, per request and in total"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        record_statement(registry, statement, time.perf_counter() - context._metrics_started)
+
+def record_statement(registry: MetricsRegistry, statement: str, seconds: float):
+    """
+    Record one executed statement. Called by the engine hooks, and directly for
+    statements run on raw DBAPI cursors, which SQLAlchemy events do not see.
+    """
+    words = statement.lstrip()[:8].split(None, 1)
+    operation = words[0].upper() if words else ""
+    registry.statement_finished(operation if operation in SQL_OPERATIONS else "OTHER", seconds)
+    stats = _current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
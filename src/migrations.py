@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for Campus Event Reporting System
+``Base.metadata.create_all`` only creates missing tables, so indexes added to
+the models later never reach an existing database. Each migration here brings
+a database from one version to the next, and the version is recorded in
+SQLite's ``PRAGMA user_version``.
+
+Usage:
+    python migrations.py                      # apply all pending migrations
+    python migrations.py --status             # show the current and latest version
+    python migrations.py --target 1           # migrate up or down to version 1
+    python migrations.py --remove-duplicates  # drop duplicate registrations/check-ins, migrate, rebuild statistics
+"""
+
+import argparse
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from db_profile import create_db_engine
+
+class MigrationError(RuntimeError):
+    """A migration cannot be applied to the data as it stands"""
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Tuple[str, ...]
+    downgrade: Tuple[str, ...]
+    # (count query, message) pairs checked before upgrading: a non-zero count aborts
+    checks: Tuple[Tuple[str, str], ...] = ()
+
+# Tables that hold at most one row per student and event once migrated
+UNIQUE_PER_STUDENT_EVENT = ("registrations", "attendance")
+
+def duplicate_check(table: str) -> Tuple[str, str]:
+    """
+    Refuse to migrate while ``table`` holds several rows for a student and event.
+    Deleting them at startup would leave the report summaries counting rows that
+    no longer exist, so removing them is an explicit step.
+    """
+    return (
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} GROUP BY student_id, event_id HAVING COUNT(*) > 1)",
+        f"{{count}} student/event pairs have more than one row in {table}. Run "
+        f"`python migrations.py --remove-duplicates` to keep the earliest of each "
+        f"and rebuild the report statistics",
+    )
+
+# Tables whose every write moves their row in table_versions to a new random value.
+# Report validators read these rows, so writes from other processes (scripts, other
+# workers, a restored snapshot or a manual edit) are seen; random values cannot
+# repeat across databases the way counters would.
+VERSIONED_TABLES = (
+    "colleges", "students", "events", "registrations", "attendance", "feedback",
+    "event_stats", "student_activity", "activity_rollups",
+)
+
+MIGRATIONS = (
+    Migration(
+        1,
+        "Indexes on college, schedule and cancellation filters; unique registrations",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_students_college_id ON students (college_id)",
+            "CREATE INDEX IF NOT EXISTS ix_events_college_id ON events (college_id)",
+            "CREATE INDEX IF NOT EXISTS ix_events_start_time ON events (start_time)",
+            "CREATE INDEX IF NOT EXISTS ix_events_is_cancelled ON events (is_cancelled)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_registrations_student_event "
+            "ON registrations (student_id, event_id)",
+        ),
+        (
+            "DROP INDEX IF EXISTS uq_registrations_student_event",
+            "DROP INDEX IF EXISTS ix_events_is_cancelled",
+            "DROP INDEX IF EXISTS ix_events_start_time",
+            "DROP INDEX IF EXISTS ix_events_college_id",
+            "DROP INDEX IF EXISTS ix_students_college_id",
+        ),
+        (duplicate_check("registrations"),),
+    ),
+    Migration(
+        2,
+        "Composite (event_id, student_id) indexes and events (college_id, start_time)",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_registrations_event_student ON registrations (event_id, student_id)",
+            "CREATE INDEX IF NOT EXISTS ix_attendance_event_student ON attendance (event_id, student_id)",
+            "CREATE INDEX IF NOT EXISTS ix_feedback_event_student ON feedback (event_id, student_id)",
+            "CREATE INDEX IF NOT EXISTS ix_events_college_start ON events (college_id, start_time)",
+            # (college_id, start_time) serves every lookup the single-column index did
+            "DROP INDEX IF EXISTS ix_events_college_id",
+        ),
+        (
+            "CREATE INDEX IF NOT EXISTS ix_events_college_id ON events (college_id)",
+            "DROP INDEX IF EXISTS ix_events_college_start",
+            "DROP INDEX IF EXISTS ix_feedback_event_student",
+            "DROP INDEX IF EXISTS ix_attendance_event_student",
+            "DROP INDEX IF EXISTS ix_registrations_event_student",
+        ),
+    ),
+    Migration(
+        3,
+        "Student-first indexes on attendance and feedback for student reports",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_attendance_student_event ON attendance (student_id, event_id)",
+            "CREATE INDEX IF NOT EXISTS ix_feedback_student_rating ON feedback (student_id, rating)",
+        ),
+        (
+            "DROP INDEX IF EXISTS ix_feedback_student_rating",
+            "DROP INDEX IF EXISTS ix_attendance_student_event",
+        ),
+    ),
+    Migration(
+        4,
+        "Unique attendance per student and event",
+        (
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_attendance_student_event ON attendance (student_id, event_id)",
+            # The unique index serves every lookup the plain one did
+            "DROP INDEX IF EXISTS ix_attendance_student_event",
+        ),
+        (
+            "CREATE INDEX IF NOT EXISTS ix_attendance_student_event ON attendance (student_id, event_id)",
+            "DROP INDEX IF EXISTS uq_attendance_student_event",
+        ),
+        (duplicate_check("attendance"),),
+    ),
+    Migration(
+        5,
+        "Per-table write versions maintained by triggers",
+        (
+            "CREATE TABLE IF NOT EXISTS table_versions "
+            "(table_name VARCHAR PRIMARY KEY, version INTEGER NOT NULL)",
+            *(
+                f"INSERT OR IGNORE INTO table_versions (table_name, version) VALUES ('{table}', random())"
+                for table in VERSIONED_TABLES
+            ),
+            *(
+                f"CREATE TRIGGER IF NOT EXISTS tv_{table}_{operation.lower()} AFTER {operation} ON {table} "
+                f"BEGIN UPDATE table_versions SET version = random() WHERE table_name = '{table}'; END"
+                for table in VERSIONED_TABLES for operation in ("INSERT", "UPDATE", "DELETE")
+            ),
+        ),
+        (
+            *(
+                f"DROP TRIGGER IF EXISTS tv_{table}_{operation.lower()}"
+                for table in VERSIONED_TABLES for operation in ("INSERT", "UPDATE", "DELETE")
+            ),
+            "DROP TABLE IF EXISTS table_versions",
+        ),
+    ),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+# Bulk loaders stop one version short and migrate after loading, so the
+# triggers do not fire once per generated row
+VERSION_TRIGGERS_MIGRATION = 5
+
+def get_schema_version(engine) -> int:
+    """Return the schema version recorded in the database"""
+    with engine.connect() as connection:
+        return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+def remove_duplicates(engine) -> Dict[str, int]:
+    """
+    Delete all but the earliest registration and check-in of each student and
+    event. The report summaries still count the deleted rows, so they must be
+    rebuilt afterwards. Returns the number of rows removed per table.
+    """
+    removed = {}
+    with engine.begin() as connection:
+        for table in UNIQUE_PER_STUDENT_EVENT:
+            removed[table] = connection.exec_driver_sql(
+                f"DELETE FROM {table} WHERE id NOT IN "
+                f"(SELECT MIN(id) FROM {table} GROUP BY student_id, event_id)"
+            ).rowcount
+    return removed
+
+def migrate(engine, target: Optional[int] = None) -> List[Migration]:
+    """
+    Bring the database to ``target`` (default: the latest version).
+    Each step runs in its own ``BEGIN IMMEDIATE`` transaction together with
+    the version bump, so concurrent starters apply it once and a failed step
+    leaves the previous version intact. Raises ``MigrationError`` when a
+    step's checks fail. Returns the migrations that ran.
+    """
+    if engine.dialect.name != "sqlite":
+        return []
+    target = LATEST_VERSION if target is None else target
+    if not 0 <= target <= LATEST_VERSION:
+        raise ValueError(f"Unknown schema version: {target} (latest is {LATEST_VERSION})")
+
+    applied = []
+    connection = engine.raw_connection()
+    driver_connection = connection.driver_connection
+    isolation_level = driver_connection.isolation_level
+    # Manage the transaction ourselves; pysqlite would autocommit each DDL statement
+    driver_connection.isolation_level = None
+    try:
+        while True:
+            cursor = driver_connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                version = cursor.execute("PRAGMA user_version").fetchone()[0]
+                if version == target:
+                    cursor.execute("COMMIT")
+                    break
+                if version > LATEST_VERSION:
+                    raise RuntimeError(f"Database schema version {version} is newer than this code ({LATEST_VERSION})")
+                if version < target:
+                    migration, statements, new_version = MIGRATIONS[version], MIGRATIONS[version].upgrade, version + 1
+                    for query, message in migration.checks:
+                        count = cursor.execute(query).fetchone()[0]
+                        if count:
+                            raise MigrationError(f"Cannot apply version {new_version}: {message.format(count=count)}")
+                else:
+                    migration, statements, new_version = MIGRATIONS[version - 1], MIGRATIONS[version - 1].downgrade, version - 1
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute(f"PRAGMA user_version = {new_version}")
+                cursor.execute("COMMIT")
+                applied.append(migration)
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            finally:
+                cursor.close()
+    finally:
+        driver_connection.isolation_level = isolation_level
+        connection.close()
+    return applied
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    parser.add_argument("--status", action="store_true", help="show the schema version and exit")
+    parser.add_argument("--target", type=int, help=f"version to migrate to (default {LATEST_VERSION})")
+    parser.add_argument(
+        "--remove-duplicates",
+        action="store_true",
+        help="delete duplicate registrations and check-ins, then migrate and rebuild the report statistics",
+    )
+    args = parser.parse_args()
+    if args.remove_duplicates and args.target is not None:
+        parser.error("--remove-duplicates always migrates to the latest version")
+
+    engine = create_db_engine()
+    version = get_schema_version(engine)
+    if args.status:
+        print(f"📋 Schema version {version} (latest {LATEST_VERSION})")
+        for migration in MIGRATIONS:
+            marker = "✅" if migration.version <= version else "⏳"
+            print(f"   {marker} {migration.version}: {migration.description}")
+        return 0
+
+    removed = {}
+    if args.remove_duplicates:
+        removed = remove_duplicates(engine)
+        for table, count in removed.items():
+            print(f"🧹 Removed {count} duplicate {table} rows")
+
+    print(f"🔄 Migrating schema from version {version}...")
+    try:
+        applied = migrate(engine, args.target)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        if any(removed.values()):
+            print("⚠️  Duplicates were removed: run rebuild_stats.py once the schema is migrated")
+        return 1
+
+    if not applied:
+        print("✅ Schema is already up to date")
+    for migration in applied:
+        action = "Reverted" if args.target is not None and args.target < version else "Applied"
+        print(f"✅ {action} version {migration.version}: {migration.description}")
+    print(f"📋 Schema version is now {get_schema_version(engine)}")
+
+    if any(removed.values()):
+        # Imported only now: main migrates the database on import
+        from main import SessionLocal
+        from rebuild_stats import SUMMARIES
+        for name, _, rebuild in SUMMARIES:
+            db = SessionLocal()
+            try:
+                rebuild(db)
+            finally:
+                db.close()
+            print(f"✅ Rebuilt {name}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
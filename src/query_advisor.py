@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Query plan advice for ad-hoc SQL
+Turns SQLite ``EXPLAIN QUERY PLAN`` rows into a tree, flags full scans of the
+large activity tables and suggests covering indexes for them. Automatic indexes
+count as full scans too: SQLite builds them by reading the whole table on every
+run, so a persistent index on the same columns is suggested instead.
+
+The index suggestions are heuristics: columns are taken from ``alias.column``
+references (or bare column names when the query reads a single table), with
+equality predicates first, then range predicates, then the other columns the
+query reads so the index can cover it.
+"""
+
+import re
+
+# Tables that grow with every registration/check-in and should never be scanned
+HOT_TABLES = ("registrations", "attendance", "feedback")
+
+_SCAN_PATTERN = re.compile(
+    r"^SCAN (?:TABLE )?(?P<name>\w+)(?: AS (?P<alias>\w+))?(?: USING (?P<covering>COVERING )?INDEX (?P<index>\w+))?"
+)
+_AUTOMATIC_INDEX_PATTERN = re.compile(
+    r"^SEARCH (?:TABLE )?(?P<name>\w+)(?: AS (?P<alias>\w+))? USING AUTOMATIC (?:PARTIAL )?"
+    r"(?P<covering>COVERING )?INDEX \((?P<constraints>[^)]*)\)"
+)
+_CONSTRAINT_COLUMN_PATTERN = re.compile(r"(\w+)\s*(?:=|>|<|IS\b)")
+_TABLE_REF_PATTERN = re.compile(
+    r"\b(?:FROM|JOIN)\s+(?P<table>\w+)(?:\s+(?:AS\s+)?(?P<alias>(?!(?:ON|WHERE|JOIN|LEFT|RIGHT|INNER|OUTER|CROSS|"
+    r"NATURAL|GROUP|ORDER|LIMIT|HAVING|UNION|USING)\b)\w+))?",
+    re.IGNORECASE
+)
+_COLUMN_REF = r"(?:(?P<{q}>\w+)\.)?(?P<{c}>\w+)"
+_OPERATOR = r"(?:=|==|<>|!=|<=|>=|<|>|\bIN\b|\bBETWEEN\b|\bLIKE\b|\bIS\b)"
+_PREDICATE_PATTERN = re.compile(
+    _COLUMN_REF.format(q="qualifier", c="column") + r"\s*(?P<operator>" + _OPERATOR + r")",
+    re.IGNORECASE
+)
+_REVERSED_PREDICATE_PATTERN = re.compile(
+    r"(?P<operator>=|==|<=|>=|<|>)\s*" + _COLUMN_REF.format(q="qualifier", c="column"),
+    re.IGNORECASE
+)
+_ANY_COLUMN_PATTERN = re.compile(_COLUMN_REF.format(q="qualifier", c="column"))
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_EQUALITY_OPERATORS = {"=", "==", "in", "is"}
+
+def build_plan_tree(rows) -> list:
+    """Nest ``(id, parent, notused, detail)`` plan rows under their parents"""
+    nodes = {}
+    roots = []
+    for row in rows:
+        node_id, parent_id, detail = row[0], row[1], row[3]
+        node = {"id": node_id, "detail": detail, "children": []}
+        nodes[node_id] = node
+        parent = nodes.get(parent_id)
+        (parent["children"] if parent else roots).append(node)
+    return roots
+
+def table_aliases(query: str, known_tables) -> dict:
+    """Map every alias (and bare table name) used in ``query`` to its table"""
+    known = {table.lower() for table in known_tables}
+    aliases = {}
+    for match in _TABLE_REF_PATTERN.finditer(query):
+        table = match.group("table").lower()
+        if table not in known:
+            continue
+        aliases[table] = table
+        if match.group("alias"):
+            aliases[match.group("alias").lower()] = table
+    return aliases
+
+def find_full_scans(rows, aliases: dict, hot_tables=HOT_TABLES) -> list:
+    """Return the plan steps that read every row of a hot table"""
+    scans = []
+    for row in rows:
+        match = _SCAN_PATTERN.match(row[3])
+        automatic = None if match else _AUTOMATIC_INDEX_PATTERN.match(row[3])
+        if not (match or automatic):
+            continue
+        match = match or automatic
+        name = (match.group("alias") or match.group("name")).lower()
+        table = aliases.get(name, name)
+        if table not in hot_tables:
+            continue
+        scans.append({
+            "table": table,
+            "alias": name,
+            "detail": row[3],
+            "index": None if automatic else match.group("index"),
+            "covering": bool(match.group("covering")),
+            # A scan below another step is repeated for every outer row;
+            # an automatic index is built once per run
+            "nested": not automatic and any(other[0] < row[0] and other[1] == row[1] for other in rows),
+            # Columns of the temporary index SQLite builds from a full scan
+            "automatic_index": [
+                column.lower() for column in _CONSTRAINT_COLUMN_PATTERN.findall(automatic.group("constraints"))
+            ] if automatic else None,
+        })
+    return scans
+
+def _columns_for(query: str, alias: str, table: str, aliases: dict, table_columns: dict):
+    """Split the columns of ``table`` read by ``query`` into equality, range and other"""
+    known_columns = {column.lower() for column in table_columns.get(table, ())}
+    single_table = len(set(aliases.values())) == 1
+    query = _LITERAL_PATTERN.sub("''", query)
+
+    def belongs(qualifier, column):
+        if column.lower() not in known_columns:
+            return False
+        if qualifier:
+            return qualifier.lower() == alias
+        return single_table
+
+    equality, ranges, other = [], [], []
+    for pattern in (_PREDICATE_PATTERN, _REVERSED_PREDICATE_PATTERN):
+        for match in pattern.finditer(query):
+            qualifier, column = match.group("qualifier"), match.group("column")
+            if not belongs(qualifier, column):
+                continue
+            target = equality if match.group("operator").lower() in _EQUALITY_OPERATORS else ranges
+            if column.lower() not in target:
+                target.append(column.lower())
+    for match in _ANY_COLUMN_PATTERN.finditer(query):
+        qualifier, column = match.group("qualifier"), match.group("column")
+        if belongs(qualifier, column) and column.lower() not in other:
+            other.append(column.lower())
+
+    ranges = [column for column in ranges if column not in equality]
+    other = [column for column in other if column not in equality and column not in ranges]
+    return equality, ranges, other
+
+def suggest_index(query: str, scan: dict, aliases: dict, table_columns: dict):
+    """Suggest a covering index that would turn ``scan`` into an index search"""
+    table = scan["table"]
+    if scan.get("automatic_index"):
+        columns = scan["automatic_index"]
+        return {
+            "table": table,
+            "columns": columns,
+            "sql": f"CREATE INDEX IF NOT EXISTS ix_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)});",
+            "reason": f"SQLite builds a temporary index on {table} ({', '.join(columns)}) "
+                      f"from a full scan on every run; a persistent one avoids that",
+        }
+    equality, ranges, other = _columns_for(query, scan["alias"], table, aliases, table_columns)
+    # The rowid is part of every index already
+    columns = [column for column in equality + ranges[:1] + other if column != "id"]
+    if not columns:
+        return None
+    if scan["covering"] and not (equality or ranges):
+        # Already scanning a covering index and there is nothing to search by
+        return None
+
+    name = f"ix_{table}_{'_'.join(columns)}"
+    reason = (
+        f"lets SQLite search {table} by {', '.join(equality + ranges[:1])}"
+        if equality or ranges else
+        f"lets SQLite read {table} from a narrower index instead of the table"
+    )
+    return {
+        "table": table,
+        "columns": columns,
+        "sql": f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)});",
+        "reason": reason,
+    }
+
+def advise(query: str, rows, table_columns: dict, hot_tables=HOT_TABLES) -> dict:
+    """Build the plan tree, full-scan warnings and index suggestions for ``query``"""
+    aliases = table_aliases(query, table_columns)
+    scans = find_full_scans(rows, aliases, hot_tables)
+
+    suggestions = []
+    for scan in scans:
+        suggestion = suggest_index(query, scan, aliases, table_columns)
+        if suggestion and suggestion["sql"] not in (item["sql"] for item in suggestions):
+            suggestions.append(suggestion)
+
+    return {
+        "plan": build_plan_tree(rows),
+        "full_scans": scans,
+        "suggestions": suggestions,
+    }
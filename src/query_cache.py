@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Result cache for ad-hoc SQL queries
+Caches /execute-sql results keyed on the normalized query text. Each result is
+tagged with the write versions of the tables it read (the ``table_versions``
+rows that SQLite triggers move on every write), and is only served while they
+are unchanged. Writes from other processes, scripts such as rebuild_stats.py
+and snapshot restores therefore invalidate it as well.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+# Quoted literals are kept verbatim; whitespace between tokens is collapsed
+_TOKEN_PATTERN = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|\s+")
+_WORD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+def normalize_query(query: str) -> str:
+    """Collapse insignificant whitespace and a trailing semicolon"""
+    normalized = _TOKEN_PATTERN.sub(lambda match: match.group(1) or " ", query)
+    return normalized.strip().rstrip(";").strip()
+
+def referenced_tables(query: str, known_tables) -> set:
+    """Return the known table names that appear as words in ``query``"""
+    known = {table.lower() for table in known_tables}
+    return {word.lower() for word in _WORD_PATTERN.findall(query)} & known
+
+class QueryResultCache:
+    """Thread-safe bounded LRU cache of query results tagged with data versions"""
+
+    def __init__(self, max_entries: int = 128, max_rows: int = 10000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, versions: tuple):
+        """Return the cached value for ``key`` if it was stored at ``versions``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != versions:
+                # Some table the query reads has been written since
+                del self._entries[key]
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, versions: tuple, value, row_count: int):
+        """Store ``value`` unless the result is too large to keep in memory"""
+        if self.max_entries <= 0 or row_count > self.max_rows:
+            return
+        with self._lock:
+            self._entries[key] = (versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "max_rows": self.max_rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
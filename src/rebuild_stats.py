@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Rebuild or verify the maintained report statistics
+Recomputes the event_stats counters, the student_activity leaderboard and the
+activity_rollups time buckets from the registrations, attendance and feedback
+tables and reports any drift from the stored values.
+"""
+
+import argparse
+import sys
+
+from main import SessionLocal, rebuild_activity_rollups, rebuild_event_stats, rebuild_student_activity
+
+SUMMARIES = (
+    ("event statistics", "event_id", rebuild_event_stats),
+    ("student leaderboard", "student_id", rebuild_student_activity),
+    ("activity rollups", "rollup", rebuild_activity_rollups),
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify report statistics")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="only report drift, do not rewrite the stored counters"
+    )
+    args = parser.parse_args()
+
+    drifted = False
+    for name, key, rebuild in SUMMARIES:
+        print(f"🔄 Verifying {name}..." if args.verify else f"🔄 Rebuilding {name}...")
+
+        db = SessionLocal()
+        try:
+            drift = rebuild(db, verify_only=args.verify)
+        finally:
+            db.close()
+
+        if not drift:
+            print(f"✅ {name.capitalize()}: stored counters match the base tables")
+            continue
+
+        drifted = True
+        print(f"⚠️  Found {len(drift)} drifted counters:")
+        for item in drift:
+            print(f"   - {key.split('_')[0]} {item[key]}: {item['counter']} stored={item['stored']} actual={item['actual']}")
+
+        if not args.verify:
+            print("✅ Drifted counters have been rebuilt")
+
+    if drifted and args.verify:
+        print("❌ Run without --verify to repair them")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,20 +2,32 @@
 """
 Refresh Sample Data Script
 This script clears existing data and creates fresh sample data for testing
+
+Usage:
+    python refresh_sample_data.py                      # clear and regenerate
+    python refresh_sample_data.py --snapshot sample    # restore "sample", creating it on first use
 """
 
 from main import (
-    College, Student, Event, Registration, Attendance, Feedback,
-    SessionLocal, engine, Base
+    College, Student, Event, Registration, Attendance, Feedback, EventStats,
+    StudentActivity, ActivityRollup, SessionLocal, engine, readonly_engine, Base,
+    rebuild_event_stats, rebuild_student_activity, rebuild_activity_rollups
 )
+from snapshots import restore_snapshot, save_snapshot, snapshot_exists
+from collections import defaultdict
 from datetime import datetime, timedelta
+import argparse
 import random
+import time
 
 def clear_existing_data():
     """Clear all existing data from the database"""
     db = SessionLocal()
     try:
         # Delete in reverse order of dependencies
+        db.query(EventStats).delete()
+        db.query(StudentActivity).delete()
+        db.query(ActivityRollup).delete()
         db.query(Feedback).delete()
         db.query(Attendance).delete()
         db.query(Registration).delete()
@@ -93,13 +105,20 @@ def create_sample_data():
         db.commit()
         print(f"✅ Created {len(events)} events")
         
+        # Index students by college and registrations by event once, instead of rescanning per event
+        students_by_college = defaultdict(list)
+        for student in students:
+            students_by_college[student.college_id].append(student)
+        registrations_by_event = defaultdict(list)
+        
         # Create sample registrations (random students register for random events)
         registrations = []
         for event in events:
             # Randomly select students to register (60-80% of students per college)
-            college_students = [s for s in students if s.college_id == event.college_id]
+            college_students = students_by_college[event.college_id]
+            # Never more than the event's capacity
             num_registrations = random.randint(
-                int(len(college_students) * 0.6),
+                min(int(len(college_students) * 0.6), event.max_capacity),
                 min(int(len(college_students) * 0.8), event.max_capacity)
             )
             
@@ -113,6 +132,7 @@ def create_sample_data():
                 )
                 db.add(registration)
                 registrations.append(registration)
+                registrations_by_event[event.id].append(registration)
         
         db.commit()
         print(f"✅ Created {len(registrations)} registrations")
@@ -122,7 +142,7 @@ def create_sample_data():
         for event in events:
             # Only create attendance for events that have started or are happening now
             if event.start_time <= datetime.utcnow():
-                event_registrations = [r for r in registrations if r.event_id == event.id]
+                event_registrations = registrations_by_event[event.id]
                 
                 # 70-90% of registered students actually attend
                 attendance_rate = random.uniform(0.7, 0.9)
@@ -165,6 +185,12 @@ def create_sample_data():
         db.commit()
         print(f"✅ Created {len(feedback_records)} feedback records")
         
+        # Bring the maintained event statistics, leaderboard and rollups in line with the new rows
+        rebuild_event_stats(db)
+        rebuild_student_activity(db)
+        rebuild_activity_rollups(db)
+        print("✅ Rebuilt event statistics, student leaderboard and activity rollups")
+        
         print("\n🎉 Sample data created successfully!")
         print(f"📊 Summary:")
         print(f"   - {len(colleges)} colleges")
@@ -173,22 +199,42 @@ def create_sample_data():
         print(f"   - {len(registrations)} registrations")
         print(f"   - {len(attendance_records)} attendance records")
         print(f"   - {len(feedback_records)} feedback records")
+        return True
         
     except Exception as e:
         print(f"❌ Error creating sample data: {e}")
         db.rollback()
+        return False
     finally:
         db.close()
 
 def main():
+    parser = argparse.ArgumentParser(description="Clear the database and load fresh sample data")
+    parser.add_argument("--snapshot", help="restore this snapshot if it exists, otherwise save the new data under it")
+    parser.add_argument("--rebuild-snapshot", action="store_true", help="regenerate the data and overwrite the snapshot")
+    args = parser.parse_args()
+
     print("🔄 Refreshing Campus Event Reporting System Sample Data")
     print("=" * 60)
     
-    # Clear existing data
-    clear_existing_data()
-    
-    # Create fresh sample data
-    create_sample_data()
+    if args.snapshot and not args.rebuild_snapshot and snapshot_exists(args.snapshot):
+        started = time.perf_counter()
+        # The file is replaced underneath the pools, so drop their connections first
+        engine.dispose()
+        readonly_engine.dispose()
+        restore_snapshot(args.snapshot, engine.url.database)
+        print(f"✅ Restored snapshot {args.snapshot!r} in {(time.perf_counter() - started) * 1000:.1f} ms")
+    else:
+        # Clear existing data
+        clear_existing_data()
+        
+        # Create fresh sample data
+        if not create_sample_data():
+            return
+        
+        if args.snapshot:
+            path = save_snapshot(args.snapshot, engine.url.database)
+            print(f"📸 Saved snapshot {args.snapshot!r} to {path}")
     
     print("\n✅ Database refreshed with new sample data!")
     print("🚀 You can now run queries and get real results!")
@@ -7,67 +7,22 @@ import sqlite3
 import pandas as pd
 from datetime import datetime
 
-def connect_to_db():
-    """Connect to the SQLite database"""
-    return sqlite3.connect("campus_events.db")
+DATABASE_PATH = "campus_events.db"
 
-def execute_query(query, description):
-    """Execute a SQL query and display results"""
-    print(f"\n{'='*60}")
-    print(f"📊 {description}")
-    print(f"{'='*60}")
-    
-    try:
-        conn = connect_to_db()
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        
-        if df.empty:
-            print("No data found.")
-        else:
-            print(df.to_string(index=False))
-            print(f"\nTotal rows: {len(df)}")
-        
-    except Exception as e:
-        print(f"❌ Error executing query: {e}")
-
-def main():
-    print("🎓 Campus Event Reporting System - SQL Query Executor")
-    print("=" * 60)
-    
-    # Get college ID from user
-    conn = connect_to_db()
-    colleges = pd.read_sql_query("SELECT id, name FROM colleges", conn)
-    conn.close()
-    
-    if colleges.empty:
-        print("❌ No colleges found. Please run sample_data.py first.")
-        return
-    
-    print("\nAvailable colleges:")
-    print(colleges.to_string(index=False))
-    
-    college_id = input("\nEnter college ID to run queries for: ").strip()
-    
-    if not college_id.isdigit():
-        print("❌ Please enter a valid college ID (number)")
-        return
-    
-    # Sample SQL Queries (adapted for our schema)
-    
+# The standard report pack: (key, description, query). Every query takes the
+# college id as its only parameter.
+STANDARD_REPORTS = [
     # 1. Total registrations per event
-    query1 = f"""
+    ("registrations_per_event", "Total Registrations per Event", """
     SELECT e.id, e.title, COUNT(r.id) AS registrations
     FROM events e
     LEFT JOIN registrations r ON r.event_id = e.id
-    WHERE e.college_id = {college_id}
+    WHERE e.college_id = :college_id
     GROUP BY e.id, e.title
     ORDER BY registrations DESC;
-    """
-    execute_query(query1, "Total Registrations per Event")
-    
+    """),
     # 2. Attendance percentage per event
-    query2 = f"""
+    ("attendance_percentage", "Attendance Percentage per Event", """
     SELECT e.id, e.title,
       COUNT(a.id) AS present,
       COUNT(r.id) AS registered,
@@ -76,53 +31,113 @@ def main():
     FROM events e
     LEFT JOIN registrations r ON r.event_id = e.id
     LEFT JOIN attendance a ON a.event_id = e.id AND a.student_id = r.student_id
-    WHERE e.college_id = {college_id}
+    WHERE e.college_id = :college_id
     GROUP BY e.id, e.title
     ORDER BY attendance_pct DESC;
-    """
-    execute_query(query2, "Attendance Percentage per Event")
-    
+    """),
     # 3. Average feedback score
-    query3 = f"""
+    ("average_feedback", "Average Feedback Score per Event", """
     SELECT e.id, e.title, ROUND(AVG(f.rating), 2) AS avg_rating, COUNT(f.id) AS feedback_count
     FROM events e
     LEFT JOIN feedback f ON f.event_id = e.id
-    WHERE e.college_id = {college_id}
+    WHERE e.college_id = :college_id
     GROUP BY e.id, e.title
     ORDER BY avg_rating DESC;
-    """
-    execute_query(query3, "Average Feedback Score per Event")
-    
+    """),
     # 4. Top 3 most active students
-    query4 = f"""
+    ("top_students", "Top 3 Most Active Students", """
     SELECT s.id, s.name, s.email, COUNT(a.id) AS attended_events
     FROM students s
     JOIN attendance a ON a.student_id = s.id
-    WHERE s.college_id = {college_id}
+    WHERE s.college_id = :college_id
     GROUP BY s.id, s.name, s.email
     ORDER BY attended_events DESC
     LIMIT 3;
-    """
-    execute_query(query4, "Top 3 Most Active Students")
-    
+    """),
     # 5. Additional useful queries
-    query5 = f"""
-    SELECT 
-        COUNT(DISTINCT e.id) AS total_events,
-        COUNT(DISTINCT r.id) AS total_registrations,
-        COUNT(DISTINCT a.id) AS total_attendance,
-        COUNT(DISTINCT f.id) AS total_feedback
-    FROM events e
-    LEFT JOIN registrations r ON r.event_id = e.id
-    LEFT JOIN attendance a ON a.event_id = e.id
-    LEFT JOIN feedback f ON f.event_id = e.id
-    WHERE e.college_id = {college_id};
-    """
-    execute_query(query5, "College Summary Statistics")
-    
+    # Each total is counted on its own: joining all three child tables at once
+    # multiplies their rows per event before COUNT(DISTINCT ...) removes them again
+    ("college_summary", "College Summary Statistics", """
+    SELECT
+        (SELECT COUNT(*) FROM events e WHERE e.college_id = :college_id) AS total_events,
+        (SELECT COUNT(*) FROM registrations r JOIN events e ON e.id = r.event_id
+         WHERE e.college_id = :college_id) AS total_registrations,
+        (SELECT COUNT(*) FROM attendance a JOIN events e ON e.id = a.event_id
+         WHERE e.college_id = :college_id) AS total_attendance,
+        (SELECT COUNT(*) FROM feedback f JOIN events e ON e.id = f.event_id
+         WHERE e.college_id = :college_id) AS total_feedback;
+    """),
+]
+
+def connect_to_db(path=DATABASE_PATH):
+    """Connect to the SQLite database"""
+    return sqlite3.connect(path)
+
+def print_report(df, description):
+    """Display a report result"""
+    print(f"\n{'='*60}")
+    print(f"📊 {description}")
+    print(f"{'='*60}")
+
+    if df.empty:
+        print("No data found.")
+    else:
+        print(df.to_string(index=False))
+        print(f"\nTotal rows: {len(df)}")
+
+def execute_query(query, description, conn=None, params=None):
+    """Execute a SQL query and display results"""
+    try:
+        owns_connection = conn is None
+        conn = conn or connect_to_db()
+        try:
+            df = pd.read_sql_query(query, conn, params=params)
+        finally:
+            if owns_connection:
+                conn.close()
+        print_report(df, description)
+    except Exception as e:
+        print(f"\n❌ Error executing query: {e}")
+
+def run_standard_reports(conn, college_id):
+    """Run the standard report pack for one college on an open connection"""
+    return {
+        key: pd.read_sql_query(query, conn, params={"college_id": college_id})
+        for key, _, query in STANDARD_REPORTS
+    }
+
+def main():
+    print("🎓 Campus Event Reporting System - SQL Query Executor")
+    print("=" * 60)
+
+    conn = connect_to_db()
+    try:
+        # Get college ID from user
+        colleges = pd.read_sql_query("SELECT id, name FROM colleges", conn)
+
+        if colleges.empty:
+            print("❌ No colleges found. Please run sample_data.py first.")
+            return
+
+        print("\nAvailable colleges:")
+        print(colleges.to_string(index=False))
+
+        college_id = input("\nEnter college ID to run queries for: ").strip()
+
+        if not college_id.isdigit():
+            print("❌ Please enter a valid college ID (number)")
+            return
+
+        # Sample SQL Queries (adapted for our schema), all on one connection
+        for _, description, query in STANDARD_REPORTS:
+            execute_query(query, description, conn, {"college_id": int(college_id)})
+    finally:
+        conn.close()
+
     print(f"\n{'='*60}")
     print("✅ All queries completed successfully!")
     print("💡 Tip: You can also run these queries directly in SQLite browser tools")
+    print("💡 Tip: python analytics.py --all-colleges computes the same reports for every college at once")
 
 if __name__ == "__main__":
     try:
@@ -6,8 +6,10 @@ This script populates the database with sample colleges, students, and events fo
 
 from main import (
     College, Student, Event, Registration, Attendance, Feedback,
-    SessionLocal, engine, Base
+    SessionLocal, engine, Base,
+    rebuild_event_stats, rebuild_student_activity, rebuild_activity_rollups
 )
+from collections import defaultdict
 from datetime import datetime, timedelta
 import random
 
@@ -73,13 +75,20 @@ def create_sample_data():
         
         db.commit()
         
+        # Index students by college and registrations by event once, instead of rescanning per event
+        students_by_college = defaultdict(list)
+        for student in students:
+            students_by_college[student.college_id].append(student)
+        registrations_by_event = defaultdict(list)
+        
         # Create sample registrations (random students register for random events)
         registrations = []
         for event in events:
             # Randomly select students to register (60-80% of students per college)
-            college_students = [s for s in students if s.college_id == event.college_id]
+            college_students = students_by_college[event.college_id]
+            # Never more than the event's capacity
             num_registrations = random.randint(
-                int(len(college_students) * 0.6),
+                min(int(len(college_students) * 0.6), event.max_capacity),
                 min(int(len(college_students) * 0.8), event.max_capacity)
             )
             
@@ -93,6 +102,7 @@ def create_sample_data():
                 )
                 db.add(registration)
                 registrations.append(registration)
+                registrations_by_event[event.id].append(registration)
         
         db.commit()
         
@@ -101,7 +111,7 @@ def create_sample_data():
         for event in events:
             # Only create attendance for events that have started or are happening now
             if event.start_time <= datetime.utcnow():
-                event_registrations = [r for r in registrations if r.event_id == event.id]
+                event_registrations = registrations_by_event[event.id]
                 
                 # 70-90% of registered students actually attend
                 attendance_rate = random.uniform(0.7, 0.9)
@@ -142,6 +152,11 @@ def create_sample_data():
         
         db.commit()
         
+        # Bring the maintained event statistics, leaderboard and rollups in line with the new rows
+        rebuild_event_stats(db)
+        rebuild_student_activity(db)
+        rebuild_activity_rollups(db)
+        
         print("Sample data created successfully!")
         print(f"Created {len(colleges)} colleges")
         print(f"Created {len(students)} students")
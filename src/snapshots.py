@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Database snapshots for Campus Event Reporting System
+Saves a populated database as a named template file with SQLite's online
+backup API and restores it with a plain file copy, so tests and benchmarks
+can reset to a known data set without deleting and regenerating rows.
+
+Restoring replaces the database file: dispose engines on it first, and do not
+restore under a running API server.
+
+Usage:
+    python snapshots.py save sample              # snapshot the configured database
+    python snapshots.py restore sample           # put it back
+    python snapshots.py build medium             # generate a scale and snapshot it
+    python snapshots.py list
+    python snapshots.py delete sample
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from sqlalchemy.engine import make_url
+
+from db_profile import create_db_engine, get_database_url
+from migrations import migrate
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+
+SNAPSHOT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+def database_path(url: str = None) -> str:
+    """Return the file behind a SQLite database URL (default: the configured one)"""
+    database = make_url(url or get_database_url()).database
+    if not database or database == ":memory:":
+        raise ValueError("Snapshots need a SQLite database file")
+    return database
+
+def snapshot_path(name: str, directory: str = None) -> str:
+    """Return the template file for snapshot ``name``"""
+    if not SNAPSHOT_NAME.match(name):
+        raise ValueError(f"Invalid snapshot name: {name!r} (use letters, digits, '_', '.' and '-')")
+    return os.path.join(directory or SNAPSHOT_DIR, f"{name}.db")
+
+def snapshot_exists(name: str, directory: str = None) -> bool:
+    return os.path.exists(snapshot_path(name, directory))
+
+def _remove_sidecars(path: str):
+    """Delete a database's WAL and shared-memory files, which belong to the old file"""
+    for suffix in ("-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def save_snapshot(name: str, source: str = None, directory: str = None) -> str:
+    """
+    Copy the database at ``source`` (default: the configured database) into
+    snapshot ``name``. The backup API reads a consistent state, including
+    pages still in the write-ahead log, while other connections keep working.
+    The template is switched to a rollback journal so it is a single file.
+    """
+    source = source or database_path()
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Database {source} does not exist")
+    target = snapshot_path(name, directory)
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+
+    # Build next to the target and rename, so a failed save keeps the old snapshot
+    partial = f"{target}.{os.getpid()}.partial"
+    try:
+        source_connection = sqlite3.connect(source)
+        target_connection = sqlite3.connect(partial)
+        try:
+            source_connection.backup(target_connection)
+            target_connection.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            target_connection.close()
+            source_connection.close()
+        os.replace(partial, target)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+        _remove_sidecars(partial)
+    return target
+
+def restore_snapshot(name: str, target: str = None, directory: str = None) -> str:
+    """
+    Replace the database at ``target`` (default: the configured database) with
+    a copy of snapshot ``name``. The copy is migrated to the current schema and
+    renamed into place, so readers see either the old file or the complete new one.
+    """
+    source = snapshot_path(name, directory)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Snapshot {name!r} does not exist")
+    target = target or database_path()
+    partial = f"{target}.{os.getpid()}.partial"
+    try:
+        shutil.copyfile(source, partial)
+        # Snapshots saved by older code lack later migrations; the default profile
+        # keeps the copy in rollback-journal mode so no WAL is left beside it
+        engine = create_db_engine(f"sqlite:///{partial}", profile="default")
+        try:
+            migrate(engine)
+        finally:
+            engine.dispose()
+        # A WAL left by the old file would be replayed onto the new one
+        _remove_sidecars(target)
+        os.replace(partial, target)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return target
+
+def delete_snapshot(name: str, directory: str = None):
+    os.remove(snapshot_path(name, directory))
+
+def list_snapshots(directory: str = None) -> List[Dict]:
+    """Return name, size and modification time of every snapshot"""
+    directory = directory or SNAPSHOT_DIR
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for filename in sorted(os.listdir(directory)):
+        name, extension = os.path.splitext(filename)
+        if extension != ".db" or not SNAPSHOT_NAME.match(name):
+            continue
+        stat = os.stat(os.path.join(directory, filename))
+        snapshots.append({"name": name, "bytes": stat.st_size, "modified": stat.st_mtime})
+    return snapshots
+
+def build_snapshot(scale: str, name: str = None, directory: str = None, **overrides) -> str:
+    """
+    Generate a database at one of ``generate_data.SCALES`` (with optional
+    DataSpec overrides) and save it as snapshot ``name`` (default: the scale).
+    """
+    # Imported here: generate_data points DATABASE_URL at a scratch file when
+    # main.py has not been imported yet, which callers of this module may not want
+    from generate_data import SCALES, create_database
+
+    spec = SCALES[scale]._replace(**overrides)
+    scratch = tempfile.mkdtemp()
+    path = os.path.join(scratch, "generated.db")
+    try:
+        create_database(path, spec)
+        return save_snapshot(name or scale, path, directory)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+def ensure_snapshot(scale: str, name: str = None, directory: str = None, **overrides) -> str:
+    """Return snapshot ``name`` (default: the scale), building it on first use"""
+    name = name or scale
+    if snapshot_exists(name, directory):
+        return snapshot_path(name, directory)
+    return build_snapshot(scale, name, directory, **overrides)
+
+@contextmanager
+def restored_database(name: str, directory: str = None):
+    """
+    Restore snapshot ``name`` into a throwaway file and yield its path; the file
+    is removed afterwards. Usable directly as a test fixture body, e.g.
+    ``with restored_database("small") as path: ...``.
+    """
+    scratch = tempfile.mkdtemp()
+    try:
+        yield restore_snapshot(name, os.path.join(scratch, "campus_events.db"), directory)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Save and restore named database snapshots")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot directory")
+    parser.add_argument("--db", help="database file (default: DATABASE_URL)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list snapshots")
+    commands.add_parser("save", help="snapshot the database").add_argument("name")
+    commands.add_parser("restore", help="replace the database with a snapshot").add_argument("name")
+    commands.add_parser("delete", help="delete a snapshot").add_argument("name")
+    build = commands.add_parser("build", help="generate a data scale and snapshot it")
+    build.add_argument("scale", choices=("small", "medium", "large"))
+    build.add_argument("--name", help="snapshot name (default: the scale)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        if args.command == "list":
+            snapshots = list_snapshots(args.dir)
+            if not snapshots:
+                print(f"📋 No snapshots in {args.dir}")
+            for snapshot in snapshots:
+                modified = time.strftime("%Y-%m-%d %H:%M", time.localtime(snapshot["modified"]))
+                print(f"   {snapshot['name']:<20} {snapshot['bytes'] / 1024 / 1024:>9.1f} MB  {modified}")
+            return 0
+        if args.command == "save":
+            path = save_snapshot(args.name, args.db, args.dir)
+            print(f"✅ Saved snapshot {args.name!r} to {path}")
+        elif args.command == "restore":
+            path = restore_snapshot(args.name, args.db, args.dir)
+            print(f"✅ Restored snapshot {args.name!r} into {path}")
+        elif args.command == "delete":
+            delete_snapshot(args.name, args.dir)
+            print(f"✅ Deleted snapshot {args.name!r}")
+        elif args.command == "build":
+            print(f"🔄 Generating the {args.scale} data set...")
+            path = build_snapshot(args.scale, args.name, args.dir)
+            print(f"✅ Saved snapshot {args.name or args.scale!r} to {path}")
+    except (ValueError, OSError, sqlite3.Error) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"⏱️  {(time.perf_counter() - started) * 1000:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
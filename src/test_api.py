@@ -6,8 +6,18 @@ This script demonstrates the API functionality with sample requests.
 
 import requests
 import json
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+from db_profile import create_db_engine, scratch_directory
+from migrations import (
+    LATEST_VERSION, UNIQUE_PER_STUDENT_EVENT, VERSIONED_TABLES,
+    MigrationError, get_schema_version, migrate, remove_duplicates,
+)
+
 BASE_URL = "http://localhost:8000"
 
 def test_api():
@@ -136,6 +146,13 @@ def test_api():
     else:
         print(f"❌ Failed to get student report: {response.text}")
     
+    # Batch student reports must match the single-student report
+    response = requests.get(f"{BASE_URL}/reports/students", params={"ids": str(student_id)})
+    if response.status_code == 200 and response.json() == [report]:
+        print("✅ Batch student report matches the single report")
+    else:
+        print(f"❌ Batch student report mismatch: {response.text}")
+    
     # Test 9: Test edge cases
     print("\n9. Testing edge cases...")
     
@@ -158,16 +175,209 @@ def test_api():
         print("   ✅ Registration for cancelled event properly rejected")
     else:
         print(f"   ❌ Cancelled event registration not handled: {response.text}")
-    
+
+    # Test 10: Metrics
+    print("\n10. Getting metrics...")
+    response = requests.get(f"{BASE_URL}/metrics")
+    if response.status_code == 200 and 'route="/reports/events/{event_id}"' in response.text:
+        print("✅ Metrics include the event report route")
+    else:
+        print(f"❌ Metrics not available: {response.status_code}")
+
     print("\n🎉 API testing completed!")
     print("\nTo test the full system:")
     print("1. Run 'python sample_data.py' to populate with sample data")
     print("2. Visit http://localhost:8000/docs for interactive API documentation")
     print("3. Use Postman or similar tools to test all endpoints")
 
+def test_concurrency():
+    """Check that a long analytical query does not delay short requests"""
+    print("\n⏱️  Testing concurrency (long SQL query vs. short requests)")
+    print("=" * 50)
+    
+    def slow_query():
+        # A distinct literal per call keeps /execute-sql from answering from its result cache
+        return {"query": f"SELECT COUNT(*), {time.time_ns()} FROM students a, students b, students c"}
+    
+    # Measure the long query on its own first
+    start = time.time()
+    response = requests.post(f"{BASE_URL}/execute-sql", json=slow_query())
+    slow_duration = time.time() - start
+    if response.status_code != 200:
+        print(f"❌ Long query failed: {response.text}")
+    assert response.status_code == 200
+    print(f"   Long query alone: {slow_duration:.2f}s")
+    if slow_duration < 0.5:
+        print("❌ Long query finished too quickly to be conclusive (populate more sample data)")
+    assert slow_duration >= 0.5, "long query too fast to prove anything"
+    
+    # Fire short requests while the long query is running
+    latencies = []
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        slow_request = pool.submit(requests.post, f"{BASE_URL}/execute-sql", json=slow_query())
+        time.sleep(0.1)
+        while not slow_request.done():
+            start = time.time()
+            requests.get(f"{BASE_URL}/events/", params={"limit": 1})
+            latencies.append(time.time() - start)
+    
+    if len(latencies) < 3:
+        print(f"❌ Only {len(latencies)} short requests completed during the long query")
+    assert len(latencies) >= 3
+    
+    worst = max(latencies)
+    print(f"   Short requests during long query: {len(latencies)}, worst latency {worst * 1000:.1f}ms")
+    if worst < slow_duration / 2:
+        print("✅ Short requests were not blocked by the long query")
+    else:
+        print("❌ Short requests were delayed by the long query")
+    assert worst < slow_duration / 2
+
+def test_streaming():
+    """Check that streamed /execute-sql results are not cut off at max_rows"""
+    print("\n🌊 Testing streamed query results vs. the row cap")
+    print("=" * 50)
+    
+    digits = " UNION ALL ".join(f"SELECT {digit} AS d" for digit in range(10))
+    query = f"SELECT a.d * 100 + b.d * 10 + c.d AS n FROM ({digits}) a, ({digits}) b, ({digits}) c"
+    max_rows = 10
+    
+    capped = requests.post(f"{BASE_URL}/execute-sql", json={"query": query, "max_rows": max_rows}).json()
+    print(f"   Buffered: {capped['row_count']} rows, truncated={capped['truncated']}")
+    assert capped["row_count"] == max_rows and capped["truncated"]
+    
+    response = requests.post(f"{BASE_URL}/execute-sql", json={
+        "query": query, "max_rows": max_rows, "stream_format": "ndjson"
+    })
+    frames = [json.loads(line) for line in response.text.splitlines()]
+    rows = [frame for frame in frames if isinstance(frame, list)]
+    trailer = frames[-1]
+    print(f"   Streamed: {len(rows)} rows, trailer {trailer}")
+    if len(rows) == trailer.get("row_count") == 1000 and "error" not in trailer:
+        print("✅ Streaming sends every row past max_rows")
+    else:
+        print("❌ Streamed result was cut short")
+    assert response.status_code == 200
+    assert len(rows) == trailer["row_count"] == 1000 and "error" not in trailer
+
+def test_registration_rush():
+    """Fire thousands of concurrent registrations at a small event and check for overbooking"""
+    print("\n🏃 Testing registration rush (concurrent registrations vs. capacity)")
+    print("=" * 50)
+    
+    capacity = 5
+    num_students = 200
+    attempts_per_student = 10
+    run_id = int(time.time() * 1000)
+    
+    college = requests.post(f"{BASE_URL}/colleges/", json={
+        "name": f"Rush University {run_id}",
+        "location": "Rush City"
+    }).json()
+    
+    start_time = datetime.utcnow() + timedelta(days=1)
+    event = requests.post(f"{BASE_URL}/events/", json={
+        "title": "Registration Rush",
+        "description": "Tiny room, huge demand",
+        "college_id": college["id"],
+        "start_time": start_time.isoformat(),
+        "end_time": (start_time + timedelta(hours=1)).isoformat(),
+        "location": "Broom Closet",
+        "max_capacity": capacity
+    }).json()
+    
+    student_ids = []
+    for i in range(num_students):
+        student = requests.post(f"{BASE_URL}/students/", json={
+            "name": f"Rush Student {i + 1}",
+            "email": f"rush{run_id}.{i + 1}@rush.edu",
+            "college_id": college["id"]
+        }).json()
+        student_ids.append(student["id"])
+    
+    # Every student tries several times, in random order
+    attempts = student_ids * attempts_per_student
+    random.shuffle(attempts)
+    
+    def register(student_id):
+        response = requests.post(f"{BASE_URL}/registrations/", json={
+            "student_id": student_id,
+            "event_id": event["id"]
+        })
+        return response.status_code, response.json().get("detail")
+    
+    print(f"   Firing {len(attempts)} registrations at an event with {capacity} seats...")
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        outcomes = list(pool.map(register, attempts))
+    status_codes = [status_code for status_code, _ in outcomes]
+    
+    accepted = status_codes.count(200)
+    rejected = status_codes.count(400)
+    busy = status_codes.count(503)
+    print(f"   Accepted: {accepted}, rejected: {rejected}, busy: {busy}")
+    
+    # Once the seats are gone, newcomers are turned away as full and the lucky
+    # few as already registered; any other reason means the guard misfired
+    reasons = Counter(detail for status_code, detail in outcomes if status_code == 400)
+    print(f"   Rejection reasons: {dict(reasons)}")
+    
+    stored = requests.post(f"{BASE_URL}/execute-sql", json={
+        "query": f"SELECT COUNT(*) FROM registrations WHERE event_id = {event['id']}"
+    }).json()["rows"][0][0]
+    report = requests.get(f"{BASE_URL}/reports/events/{event['id']}").json()
+    print(f"   Stored registrations: {stored}, reported: {report['total_registrations']}")
+    
+    if accepted == stored == report["total_registrations"] == capacity:
+        print("✅ Every seat was taken once, with no overbooking")
+    else:
+        print("❌ Event was overbooked, left seats empty or counters disagree")
+    assert accepted == stored == report["total_registrations"] == capacity
+    assert accepted + rejected + busy == len(attempts)
+    assert reasons["Event is at full capacity"] > 0
+    assert set(reasons) <= {"Event is at full capacity", "Already registered for this event"}
+
+def test_migration_duplicates():
+    """Check that migrations stop at duplicate registrations and check-ins until they are removed"""
+    print("\n🧬 Testing migrations on a database with duplicates")
+    print("=" * 50)
+    
+    # A version 0 database: every table the migrations index or attach triggers to
+    engine = create_db_engine(f"sqlite:///{scratch_directory()}/migrate.db")
+    with engine.begin() as connection:
+        for table in VERSIONED_TABLES:
+            connection.exec_driver_sql(
+                f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, student_id INTEGER, event_id INTEGER, "
+                "college_id INTEGER, start_time DATETIME, is_cancelled BOOLEAN, rating INTEGER)"
+            )
+        for table in UNIQUE_PER_STUDENT_EVENT:
+            connection.exec_driver_sql(f"INSERT INTO {table} (student_id, event_id) VALUES (1, 1), (1, 1), (2, 1)")
+    
+    try:
+        try:
+            migrate(engine)
+            error = None
+        except MigrationError as e:
+            error = str(e)
+        print(f"   Migration refused: {error}")
+        assert error is not None and "--remove-duplicates" in error
+        assert get_schema_version(engine) == 0
+        
+        removed = remove_duplicates(engine)
+        print(f"   Removed duplicates: {removed}")
+        assert removed == {table: 1 for table in UNIQUE_PER_STUDENT_EVENT}
+        migrate(engine)
+        assert get_schema_version(engine) == LATEST_VERSION
+        print("✅ Duplicates block the migration until they are removed")
+    finally:
+        engine.dispose()
+
 if __name__ == "__main__":
     try:
+        test_migration_duplicates()
         test_api()
+        test_concurrency()
+        test_streaming()
+        test_registration_rush()
     except requests.exceptions.ConnectionError:
         print("❌ Could not connect to API. Make sure the server is running:")
         print("   python main.py")